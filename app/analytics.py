@@ -1,9 +1,13 @@
-import calendar
-from collections import defaultdict
-from datetime import datetime
+import json
+import time
+from typing import Dict, List, Optional, Sequence
 
-from app.libs import load_cached_data
+import numpy as np
+
+from app.libs import generation_memo, load_cached_data
 from app.models import AnalyticsResponse, ChartData, Launch, Rocket
+from app.query_cache import matching_positions, query_key
+from app.store import LaunchStore
 
 
 def rocket_success_rate(launches: list[Launch], rockets: list[Rocket]) -> ChartData:
@@ -35,26 +39,108 @@ def launches_by_site(launches: list[Launch]) -> ChartData:
 
 
 def launch_frequency(launches: list[Launch]) -> ChartData:
-    freq = defaultdict(lambda: {m: 0 for m in calendar.month_name[1:]})
+    # month counts by index, gmtime is much cheaper than a datetime per row
+    freq: dict[int, list[int]] = {}
 
     for item in launches:
-        t = item.date_unix
-        dt = datetime.utcfromtimestamp(t)
-        freq[dt.year][calendar.month_name[dt.month]] += 1
+        t = time.gmtime(item.date_unix)
+        freq.setdefault(t.tm_year, [0] * 12)[t.tm_mon - 1] += 1
 
     labels = list(freq.keys())
-    values = [list(freq[year].values()) for year in labels]
+    values = list(freq.values())
 
     return {"labels": labels, "values": values}
 
 
-async def analytics(request) -> AnalyticsResponse:
-    data = await load_cached_data(request)
-    rate = rocket_success_rate(data["launches"], data["rockets"])
-    site_launches = launches_by_site(data["launches"])
-    lf = launch_frequency(data["launches"])
+def _group(codes: np.ndarray) -> tuple:
+    """unique codes in order of first appearance plus each row's group"""
+    uniq, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    # renumber groups so group 0 is the first one seen
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return uniq[order], rank[inverse]
+
+
+def aggregate(
+    store: LaunchStore,
+    rockets: Optional[List[Rocket]] = None,
+    positions: Optional[Sequence[int]] = None,
+) -> AnalyticsResponse:
+    """all analytics over the store columns, optionally for a subset of rows
+
+    Names come from the store's join index unless `rockets` is given.
+    """
+    rows = slice(None) if positions is None else np.asarray(positions, dtype=np.intp)
+    rocket_col = store.rocket_col[rows]
+    launchpad_col = store.launchpad_col[rows]
+    success_col = store.success_col[rows]
+    year_col = store.year_col[rows]
+    month_col = store.month_col[rows]
+
+    rocket_names = (
+        store.rocket_names if rockets is None else {r.id: r.name for r in rockets}
+    )
+    codes, groups = _group(rocket_col)
+    rates = np.bincount(groups, weights=success_col) / np.bincount(groups)
+    rate: ChartData = {
+        "labels": [
+            rocket_names.get(store.rocket_ids[c], store.rocket_ids[c]) for c in codes
+        ],
+        "values": rates.tolist(),
+    }
+
+    codes, groups = _group(launchpad_col)
+    site_launches: ChartData = {
+        "labels": [store.launchpad_ids[c] for c in codes],
+        "values": np.bincount(groups).tolist(),
+    }
+    site_names = {
+        site: store.launchpad_names[site]
+        for site in site_launches["labels"]
+        if site in store.launchpad_names
+    }
+
+    years, groups = _group(year_col)
+    months = np.zeros((len(years), 12), dtype=np.int64)
+    np.add.at(months, (groups, month_col), 1)
+    lf = {"labels": years.tolist(), "values": months.tolist()}
+
     return {
         "successByRocket": rate,
         "launchesBySite": site_launches,
         "frequencyByYear": lf,
+        "launchpadNames": site_names,
     }
+
+
+def compute_analytics(data: Dict) -> AnalyticsResponse:
+    return aggregate(data["store"])
+
+
+def analytics_json(data: Dict) -> bytes:
+    """analytics of a cache generation, serialized once and reused"""
+    return generation_memo(
+        data,
+        "analytics",
+        lambda: json.dumps(compute_analytics(data), separators=(",", ":")).encode(),
+    )
+
+
+def analytics_body(data: Dict, **filters) -> bytes:
+    """analytics JSON for the filtered subset of a cache generation"""
+    key = query_key(**filters)
+    if key is None:
+        return analytics_json(data)
+
+    def compute() -> bytes:
+        positions = matching_positions(data, **filters)
+        result = aggregate(data["store"], positions=positions)
+        return json.dumps(result, separators=(",", ":")).encode()
+
+    return data["queries"].get_or_compute(("analytics", key), compute)
+
+
+async def analytics(request, **filters) -> bytes:
+    data = await load_cached_data(request)
+    return analytics_body(data, **filters)
@@ -0,0 +1,109 @@
+"""compact resident representation of the cached launches"""
+
+import json
+import sys
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from app.models import Failures, Launch
+
+
+class LaunchRecord:
+    """Slotted, already validated launch as kept in the cache.
+
+    Foreign-key ids are interned so every launch of a rocket or launchpad
+    shares one string, `links` is kept as its compact JSON and only decoded
+    on access. Records are turned back into `Launch` at the API boundary.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "date_utc",
+        "date_unix",
+        "rocket",
+        "launchpad",
+        "success",
+        "details",
+        "failures",
+        "_links",
+    )
+
+    def __init__(self, launch: Launch):
+        self.id = launch.id
+        self.name = launch.name
+        self.date_utc = launch.date_utc
+        self.date_unix = launch.date_unix
+        self.rocket = sys.intern(launch.rocket)
+        self.launchpad = sys.intern(launch.launchpad)
+        self.success = launch.success
+        self.details = launch.details
+        # almost always empty, share one tuple instead of a list per launch
+        self.failures: Tuple[Failures, ...] = tuple(launch.failures)
+        self._links: Optional[bytes] = (
+            json.dumps(launch.links, separators=(",", ":")).encode()
+            if launch.links
+            else None
+        )
+
+    @property
+    def links(self) -> dict:
+        return json.loads(self._links) if self._links is not None else {}
+
+    @property
+    def links_json(self) -> bytes:
+        """`links` as compact JSON, without decoding it"""
+        return self._links if self._links is not None else b"{}"
+
+    def to_launch(self) -> Launch:
+        """materialize the API model, the fields were validated on the way in"""
+        return Launch.model_construct(
+            id=self.id,
+            name=self.name,
+            date_utc=self.date_utc,
+            date_unix=self.date_unix,
+            rocket=self.rocket,
+            launchpad=self.launchpad,
+            success=self.success,
+            details=self.details,
+            links=self.links,
+            failures=list(self.failures),
+        )
+
+
+def compact(launch: Union[Launch, LaunchRecord]) -> LaunchRecord:
+    return launch if isinstance(launch, LaunchRecord) else LaunchRecord(launch)
+
+
+class LaunchTable(Sequence[Launch]):
+    """Read-only sequence of cached launches backed by LaunchRecords.
+
+    Indexing and iteration hand out fresh `Launch` models, code that only
+    needs the scalar fields (indexes, columns) should read `records`.
+    """
+
+    __slots__ = ("records",)
+
+    def __init__(self, launches: Iterable[Union[Launch, LaunchRecord]]):
+        self.records: List[LaunchRecord] = [compact(launch) for launch in launches]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @overload
+    def __getitem__(self, index: int) -> Launch: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Launch]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [record.to_launch() for record in self.records[index]]
+        return self.records[index].to_launch()
+
+    def __iter__(self) -> Iterator[Launch]:
+        return (record.to_launch() for record in self.records)
+
+
+def launch_records(launches: Sequence) -> Sequence:
+    """the resident records behind `launches`, the sequence itself otherwise"""
+    return launches.records if isinstance(launches, LaunchTable) else launches
@@ -0,0 +1,135 @@
+"""Accept-Encoding negotiation and response compression"""
+
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is always available
+    zstandard = None
+
+# bodies below this size are not worth the CPU and the extra headers
+MIN_COMPRESS_SIZE = 1024
+
+
+class Encoder(NamedTuple):
+    # one-shot, high effort - used for bodies compressed once per generation
+    compress: Callable[[bytes], bytes]
+    # incremental, fast - used for streamed responses
+    stream: Callable[[Iterable[bytes]], Iterator[bytes]]
+
+
+def _gzip_compress(data: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        # sync flush so every chunk reaches the client as it is produced
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+ENCODERS: Dict[str, Encoder] = {"gzip": Encoder(_gzip_compress, _gzip_stream)}
+
+if brotli is not None:
+
+    def _brotli_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+    ENCODERS["br"] = Encoder(
+        lambda data: brotli.compress(data, quality=9), _brotli_stream
+    )
+
+if zstandard is not None:
+
+    def _zstd_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        yield compressor.flush()
+
+    ENCODERS["zstd"] = Encoder(
+        lambda data: zstandard.ZstdCompressor(level=10).compress(data), _zstd_stream
+    )
+
+# server preference when the client weighs encodings equally
+PREFERENCE = [name for name in ("br", "zstd", "gzip") if name in ENCODERS]
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """best supported encoding for an Accept-Encoding header, None for identity"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in PREFERENCE:
+        q = weights.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def request_encoding(request: Request) -> Optional[str]:
+    return negotiate(request.headers.get("accept-encoding"))
+
+
+def compressed_response(
+    request: Request,
+    body: bytes,
+    cached: Optional[Callable[[str, Callable[[], bytes]], bytes]] = None,
+    media_type: str = "application/json",
+) -> Response:
+    """response with `body` compressed for the client
+
+    `cached(encoding, compress)` lets the caller keep the compressed variant,
+    bodies that live for a whole cache generation are compressed only once.
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = request_encoding(request)
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return Response(body, media_type=media_type, headers=headers)
+
+    def compress() -> bytes:
+        return ENCODERS[encoding].compress(body)
+
+    content = cached(encoding, compress) if cached is not None else compress()
+    headers["Content-Encoding"] = encoding
+    return Response(content, media_type=media_type, headers=headers)
+
+
+def compress_stream(
+    chunks: Iterable[Union[str, bytes]], encoding: Optional[str]
+) -> Iterable[Union[str, bytes]]:
+    """compress a streamed body chunk by chunk, passthrough for identity"""
+    if encoding is None:
+        return chunks
+    encoded = (c.encode() if isinstance(c, str) else c for c in chunks)
+    return ENCODERS[encoding].stream(encoded)
@@ -0,0 +1,72 @@
+"""conditional GET support (ETag / Last-Modified) for cached data"""
+
+import hashlib
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict
+
+from fastapi import Request, Response, status
+
+from app.compression import request_encoding
+from app.libs import load_cached_data
+
+
+def cache_validators(request: Request, cache: Dict) -> Dict[str, str]:
+    """ETag and Last-Modified of a response built from `cache`
+
+    The ETag covers the dataset (generation and fetch time, workers refresh
+    independently), path, query and the negotiated content encoding, so it
+    is strong for the exact representation sent.
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    encoding = request_encoding(request)
+    raw = f"{cache['generation']}:{cache['fetched_at']}:{request.url.path}?{query}"
+    raw += f";{encoding}"
+    etag = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+    return {
+        "ETag": f'"{etag}"',
+        "Last-Modified": formatdate(cache["fetched_at"], usegmt=True),
+    }
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """whether the client's cached copy is still current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since, weak comparison per RFC 9110
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or headers["ETag"] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+        modified = parsedate_to_datetime(headers["Last-Modified"])
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        # "-0000" parses naive, HTTP dates are UTC anyway
+        since = since.replace(tzinfo=timezone.utc)
+    return modified <= since
+
+
+async def conditional_response(
+    request: Request, build: Callable[[Dict], Response]
+) -> Response:
+    """answer 304 for a matching validator, else build the response from cache
+
+    The check runs before `build`, so revalidating clients cost neither
+    filtering nor serialization.
+    """
+    cache = await load_cached_data(request)
+    headers = cache_validators(request, cache)
+    if not_modified(request, headers):
+        # a 304 carries the Vary of the 200, the ETag depends on the encoding
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={**headers, "Vary": "Accept-Encoding"},
+        )
+    response = build(cache)
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,127 @@
+"""response bodies encoded once per cache generation"""
+
+import json
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from pydantic import TypeAdapter
+
+from app.compact import LaunchRecord, launch_records
+from app.libs import generation_memo
+from app.models import Failures, Launch, Launchpad, Rocket
+from app.store import LaunchStore
+
+LAUNCH_JSON = TypeAdapter(Launch)
+FAILURES_JSON = TypeAdapter(List[Failures])
+ROCKETS_JSON = TypeAdapter(List[Rocket])
+LAUNCHPADS_JSON = TypeAdapter(List[Launchpad])
+
+
+def encoded_launches(cache: Dict) -> List[bytes]:
+    """compact JSON of every cached launch, encoded once per cache generation"""
+    return generation_memo(
+        cache,
+        "launch_json",
+        lambda: [LAUNCH_JSON.dump_json(launch) for launch in cache["launches"]],
+    )
+
+
+def _joined(store: LaunchStore, rocket: str, launchpad: str) -> bytes:
+    """JSON members with the names joined in for one rocket/launchpad pair"""
+    pad = store.launchpads_by_id.get(launchpad)
+    members = {
+        "rocket_name": store.rocket_names.get(rocket),
+        "launchpad_name": pad.name if pad is not None else None,
+        "launchpad_region": pad.region if pad is not None else None,
+    }
+    return json.dumps(members, separators=(",", ":")).encode()[1:-1]
+
+
+def _append(row: bytes, members: bytes) -> bytes:
+    return row[:-1] + (b"," if len(row) > 2 else b"") + members + b"}"
+
+
+def embedded_launches(cache: Dict) -> List[bytes]:
+    """encoded launches with rocket and launchpad names, once per generation"""
+
+    def build() -> List[bytes]:
+        store = cache["store"]
+        joined: Dict[Tuple[str, str], bytes] = {}
+        rows = []
+        for record, row in zip(
+            launch_records(cache["launches"]), encoded_launches(cache)
+        ):
+            pair = (record.rocket, record.launchpad)
+            if pair not in joined:
+                joined[pair] = _joined(store, *pair)
+            rows.append(_append(row, joined[pair]))
+        return rows
+
+    return generation_memo(cache, "launch_json_embedded", build)
+
+
+def _projected(record: LaunchRecord, fields: Sequence[str]) -> bytes:
+    """JSON object of the chosen fields straight from a resident record"""
+    members = []
+    for field in fields:
+        if field == "links":
+            value = record.links_json
+        elif field == "failures":
+            failures = record.failures
+            value = FAILURES_JSON.dump_json(list(failures)) if failures else b"[]"
+        else:
+            value = json.dumps(
+                getattr(record, field), ensure_ascii=False, separators=(",", ":")
+            ).encode()
+        members.append(b'"' + field.encode() + b'":' + value)
+    return b"{" + b",".join(members) + b"}"
+
+
+def launches_body(
+    cache: Dict,
+    positions: Optional[Sequence[int]] = None,
+    include: Optional[Set[str]] = None,
+    embed: bool = False,
+) -> bytes:
+    """JSON array of the launches at `positions`, all of them when None
+
+    With `include` only those fields are serialized, straight from the
+    resident records instead of the pre-encoded rows. `embed` adds the
+    joined rocket and launchpad names.
+    """
+    if include is not None:
+        records = launch_records(cache["launches"])
+        rows = positions if positions is not None else range(len(records))
+        # same member order as the full rows
+        fields = [field for field in Launch.model_fields if field in include]
+        encoded = [_projected(records[pos], fields) for pos in rows]
+        if embed:
+            joined: Dict[Tuple[str, str], bytes] = {}
+            for i, pos in enumerate(rows):
+                pair = (records[pos].rocket, records[pos].launchpad)
+                if pair not in joined:
+                    joined[pair] = _joined(cache["store"], *pair)
+                encoded[i] = _append(encoded[i], joined[pair])
+        return b"[" + b",".join(encoded) + b"]"
+
+    encoded = embedded_launches(cache) if embed else encoded_launches(cache)
+    if positions is None:
+        return generation_memo(
+            cache,
+            "launches_body_embedded" if embed else "launches_body",
+            lambda: b"[" + b",".join(encoded) + b"]",
+        )
+    return b"[" + b",".join([encoded[pos] for pos in positions]) + b"]"
+
+
+def rockets_body(cache: Dict) -> bytes:
+    return generation_memo(
+        cache, "rockets_body", lambda: ROCKETS_JSON.dump_json(cache["rockets"])
+    )
+
+
+def launchpads_body(cache: Dict) -> bytes:
+    return generation_memo(
+        cache,
+        "launchpads_body",
+        lambda: LAUNCHPADS_JSON.dump_json(cache["launchpads"]),
+    )
@@ -1,33 +1,50 @@
 import csv
-import json
+import os
 from io import StringIO
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 
 from fastapi.responses import StreamingResponse
 
+from app.compression import compress_stream
+from app.encoded import LAUNCH_JSON
 from app.models import Launch
 
+CSV_FIELDS = [
+    "id",
+    "name",
+    "date_utc",
+    "date_unix",
+    "rocket",
+    "launchpad",
+    "success",
+    "details",
+]
+CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", "500"))
+JSON_CHUNK_SIZE = 500
+JSON_FORMATS = {
+    "json": ("application/json", "launches.json"),
+    "ndjson": ("application/x-ndjson", "launches.ndjson"),
+}
 
-def export_to_csv(launches: List[Launch]) -> StreamingResponse:
-    """
-    Export to CSV format.
-    """
+
+def iter_csv(
+    launches: Iterable[Launch],
+    chunk_size: int = CSV_CHUNK_SIZE,
+    include: Optional[Set[str]] = None,
+) -> Iterator[str]:
+    """Yield the CSV header and then blocks of `chunk_size` rows."""
     output = StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=[
-            "id",
-            "name",
-            "date_utc",
-            "date_unix",
-            "rocket",
-            "launchpad",
-            "success",
-            "details",
-        ],
-    )
+    columns = CSV_FIELDS if include is None else [f for f in CSV_FIELDS if f in include]
+    writer = csv.DictWriter(output, fieldnames=columns, extrasaction="ignore")
+
+    def flush() -> str:
+        chunk = output.getvalue()
+        output.seek(0)
+        output.truncate()
+        return chunk
 
     writer.writeheader()
+    rows = 0
     for launch in launches:
         writer.writerow(
             {
@@ -41,21 +58,105 @@ def export_to_csv(launches: List[Launch]) -> StreamingResponse:
                 "details": launch.details or "",
             }
         )
+        rows += 1
+        if rows % chunk_size == 0:
+            yield flush()
 
-    output.seek(0)
+    chunk = flush()
+    if chunk:
+        yield chunk
+
+
+def _headers(filename: str, encoding: Optional[str]) -> Dict[str, str]:
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Vary": "Accept-Encoding",
+    }
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def export_to_csv(
+    launches: Iterable[Launch],
+    chunk_size: int = CSV_CHUNK_SIZE,
+    encoding: Optional[str] = None,
+    include: Optional[Set[str]] = None,
+) -> StreamingResponse:
+    """
+    Export to CSV format, streamed in chunks of rows.
+    """
     return StreamingResponse(
-        iter([output.getvalue()]),
+        compress_stream(iter_csv(launches, chunk_size, include), encoding),
         media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=launches.csv"},
+        headers=_headers("launches.csv", encoding),
     )
 
 
-def export_to_json(launches: List[Launch]) -> StreamingResponse:
-    """Export launches to JSON format."""
-    data = [launch.model_dump() for launch in launches]
+def iter_json(
+    launches: Iterable[Launch],
+    fmt: str = "json",
+    indent: Optional[int] = None,
+    encoded: Optional[Iterable[bytes]] = None,
+    chunk_size: int = JSON_CHUNK_SIZE,
+    include: Optional[Set[str]] = None,
+) -> Iterator[bytes]:
+    """Yield a JSON array or NDJSON document in blocks of `chunk_size` rows.
+
+    Rows come from `encoded` when given and neither indentation nor a field
+    projection is wanted, otherwise each launch is serialized on the way out.
+    """
+    if encoded is None or indent or include is not None:
+        rows: Iterable[bytes] = (
+            LAUNCH_JSON.dump_json(launch, indent=indent, include=include)
+            for launch in launches
+        )
+    else:
+        rows = encoded
+
+    if fmt == "ndjson":
+        start, separator, end = b"", b"\n", b"\n"
+    elif indent:
+        start, separator, end = b"[\n", b",\n", b"\n]"
+    else:
+        start, separator, end = b"[", b",", b"]"
+
+    chunk: List[bytes] = [start]
+    count = 0
+    for row in rows:
+        if count:
+            chunk.append(separator)
+        chunk.append(row)
+        count += 1
+        if count % chunk_size == 0:
+            yield b"".join(chunk)
+            chunk = []
+
+    if not count:
+        yield b"" if fmt == "ndjson" else b"[]"
+        return
+    chunk.append(end)
+    yield b"".join(chunk)
+
+
+def export_to_json(
+    launches: Iterable[Launch],
+    fmt: str = "json",
+    indent: Optional[int] = 2,
+    encoded: Optional[Iterable[bytes]] = None,
+    encoding: Optional[str] = None,
+    include: Optional[Set[str]] = None,
+) -> StreamingResponse:
+    """Export launches as a streamed JSON array or NDJSON."""
+    if fmt == "ndjson":
+        # one compact record per line
+        indent = None
+    media_type, filename = JSON_FORMATS[fmt]
 
     return StreamingResponse(
-        iter([json.dumps(data, indent=2)]),
-        media_type="application/json",
-        headers={"Content-Disposition": "attachment; filename=launches.json"},
+        compress_stream(
+            iter_json(launches, fmt, indent, encoded, include=include), encoding
+        ),
+        media_type=media_type,
+        headers=_headers(filename, encoding),
     )
@@ -1,107 +1,497 @@
 """spacex app main methods"""
 
 import asyncio
+import json
 import logging
+import os
 import time
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import httpx
-from fastapi import Request
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
 
+from app.compact import LaunchTable, compact, launch_records
+from app.metrics import (
+    CACHE_REQUESTS,
+    REFRESHES,
+    UPSTREAM_DURATION,
+    UPSTREAM_ERRORS,
+    UPSTREAM_HEDGES,
+    UPSTREAM_RETRIES,
+    VALIDATION_DURATION,
+)
 from app.models import Launch, Launchpad, Rocket
+from app.query_cache import QueryCache
+from app.resilience import CircuitBreaker, backoff, hedged
+from app.snapshot import Snapshot, read_snapshot, write_snapshot
+from app.sources import data_source
+from app.store import LaunchStore
+from app.validation import RecordStream, Validated, validate_records
 
 BASE_URL = "https://api.spacexdata.com/v4"
 CACHE_DATA = None
 CACHE_EXPIRES = 0
 CACHE_TTL = 600
+STALE_TTL = 60
+REFRESH_AHEAD = 60
+REFRESH_RETRY = 30
 CACHE_LOCK = asyncio.Lock()
+# an http(s) base URL or a local snapshot file / directory of JSON or NDJSON
+SOURCE = data_source(os.getenv("DATA_SOURCE", BASE_URL))
+ENDPOINTS = ("launches", "rockets", "launchpads")
+MODELS = {"launches": Launch, "rockets": Rocket, "launchpads": Launchpad}
+# "incremental" refetches only upcoming/recent launches between full reloads
+REFRESH_MODE = os.getenv("REFRESH_MODE", "full")
+DELTA_WINDOW = 30 * 24 * 3600
+FULL_REFRESH_INTERVAL = 24 * 3600
+# remote sources only: an attempt fails when the upstream sends nothing for
+# this long - the wait for each chunk is timed, never the validation of it
+FETCH_TIMEOUT = 5
+FETCH_TIMEOUTS = {"launches": 15}
+# a second request is raced against one with no answer after this long
+HEDGE_AFTER = {"launches": 2, "rockets": 1, "launchpads": 1}
+# transient errors are retried with full-jitter exponential backoff
+FETCH_RETRIES = 2
+RETRY_BACKOFF = 0.1
+RETRY_BACKOFF_MAX = 1
+# after this many failed fetches in a row the upstream is left alone for the
+# cool-down and the stale cache is served right away
+BREAKER = CircuitBreaker(threshold=3, cooldown=30)
 
 
-async def get_data(endpoint: str) -> Optional[List]:
-    """Fetch JSON from SpaceX API and convert each item to a dataclass."""
+async def _stream_records(
+    endpoint: str,
+    answered: Optional[asyncio.Event] = None,
+    timeout: Optional[float] = None,
+) -> Validated:
+    """validate a collection record by record while it is being read
+
+    `timeout` bounds the wait for every chunk, not the whole body. The time
+    spent validating is kept apart in the result's `seconds`.
+    """
+    transform = compact if endpoint == "launches" else None
+    records = RecordStream(MODELS[endpoint], transform)
+    chunks = SOURCE.stream(endpoint)
+    seconds = 0.0
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(f"{BASE_URL}/{endpoint}")
-            resp.raise_for_status()
-            return resp.json()
-    except httpx.TimeoutException:
-        logging.error(f"Timeout fetching {endpoint}")
+        while True:
+            try:
+                chunk = await asyncio.wait_for(anext(chunks), timeout)
+            except StopAsyncIteration:
+                break
+            if answered is not None:
+                answered.set()
+            start = time.perf_counter()
+            records.feed(chunk)
+            seconds += time.perf_counter() - start
+    finally:
+        await chunks.aclose()
+    start = time.perf_counter()
+    validated = records.close()
+    seconds += time.perf_counter() - start
+    return validated._replace(seconds=seconds)
+
+
+async def _read(
+    endpoint: str,
+    query: Optional[Dict],
+    answered: Optional[asyncio.Event] = None,
+    timeout: Optional[float] = None,
+):
+    if query is None:
+        return await _stream_records(endpoint, answered, timeout)
+    return await asyncio.wait_for(SOURCE.fetch(endpoint, query), timeout)
+
+
+def _retryable(e: Exception) -> bool:
+    """timeouts, connection problems and 5xx/429 answers are worth a retry"""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500 or e.response.status_code == 429
+    return isinstance(e, (httpx.TransportError, asyncio.TimeoutError))
+
+
+async def _fetch(endpoint: str, query: Optional[Dict], label: str):
+    """one remote fetch with read timeouts, hedging and jittered retries"""
+    timeout = FETCH_TIMEOUTS.get(endpoint, FETCH_TIMEOUT)
+
+    async def attempt(answered: asyncio.Event):
+        return await _read(endpoint, query, answered, timeout)
+
+    for retry in range(FETCH_RETRIES + 1):
+        try:
+            return await hedged(
+                attempt, HEDGE_AFTER.get(endpoint), lambda: UPSTREAM_HEDGES.inc(label)
+            )
+        except Exception as e:
+            if retry == FETCH_RETRIES or not _retryable(e):
+                raise
+            logging.warning(f"Retrying {endpoint} after {e!r}")
+            UPSTREAM_RETRIES.inc(label)
+            await asyncio.sleep(backoff(retry, RETRY_BACKOFF, RETRY_BACKOFF_MAX))
+
+
+async def get_data(
+    endpoint: str, query: Optional[Dict] = None
+) -> Optional[Union[Validated, List]]:
+    """Fetch JSON from the data source, optionally through its query endpoint.
+
+    Plain collections are validated (and launches compacted) as they stream
+    in and come back as Validated, query results as the decoded list of
+    documents. A body that is not a valid collection counts as a failure.
+    Remote sources get read timeouts, retries and hedging, and are not
+    called at all while the circuit is open. Local files are read as they
+    are, however long a large archive takes.
+    """
+    label = endpoint if query is None else f"{endpoint}/query"
+    remote = SOURCE.remote
+    if remote and not BREAKER.allow():
+        logging.warning(f"Circuit open, not fetching {endpoint}")
+        UPSTREAM_ERRORS.inc(label, "circuit_open")
         return None
-    except httpx.HTTPStatusError as e:
-        logging.error(f"HTTP error {e.response.status_code} for {endpoint}")
+
+    start, data = time.perf_counter(), None
+    try:
+        if remote:
+            data = await _fetch(endpoint, query, label)
+        else:
+            data = await _read(endpoint, query)
+    except Exception as e:
+        kind, message = _failure(endpoint, e)
+        logging.error(message)
+        UPSTREAM_ERRORS.inc(label, kind)
+        if remote:
+            BREAKER.failure()
         return None
-    except httpx.RequestError as e:
-        logging.error(f"Network error fetching {endpoint}: {e}")
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_DURATION.observe(elapsed - _validation_seconds(data), label)
+    if remote:
+        BREAKER.success()
+    return data
+
+
+def _validation_seconds(data: Any) -> float:
+    """validation time spent while a collection was streamed in"""
+    return data.seconds if isinstance(data, Validated) else 0.0
+
+
+def _failure(endpoint: str, e: Exception) -> Tuple[str, str]:
+    """error kind and log message for a failed fetch"""
+    if isinstance(e, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return "timeout", f"Timeout fetching {endpoint}"
+    if isinstance(e, httpx.HTTPStatusError):
+        return "http", f"HTTP error {e.response.status_code} for {endpoint}"
+    if isinstance(e, httpx.RequestError):
+        return "network", f"Network error fetching {endpoint}: {e}"
+    if isinstance(e, OSError):
+        return "io", f"Error reading {endpoint}: {e}"
+    if isinstance(e, (json.JSONDecodeError, ValidationError)):
+        return "invalid", f"Invalid {endpoint} payload: {e}"
+    return "other", f"Unexpected error fetching {endpoint}: {e}"
+
+
+async def load_all_data() -> Optional[Dict]:
+    """fetch all endpoints concurrently, None if any of them failed"""
+    results = await asyncio.gather(*(get_data(endpoint) for endpoint in ENDPOINTS))
+    if any(result is None for result in results):
         return None
-    except Exception as e:
-        logging.error(f"Unexpected error fetching {endpoint}: {e}")
+    return dict(zip(ENDPOINTS, results))
+
+
+async def load_delta_data(since: int) -> Optional[Dict]:
+    """fetch upcoming and recent launches only, plus the small collections"""
+    query = {"$or": [{"upcoming": True}, {"date_unix": {"$gte": since}}]}
+    results = await asyncio.gather(
+        get_data("launches", query), get_data("rockets"), get_data("launchpads")
+    )
+    if any(result is None for result in results):
         return None
+    return dict(zip(ENDPOINTS, results))
+
+
+def build_cache(
+    launches: List[Launch],
+    rockets: List[Rocket],
+    launchpads: List[Launchpad],
+    fetched_at: float,
+    generation: int,
+) -> Dict:
+    """assemble a cache generation with its lookup structures"""
+    launches = LaunchTable(launches)
+    return {
+        "launches": launches,
+        "rockets": rockets,
+        "launchpads": launchpads,
+        "store": LaunchStore(launches, rockets, launchpads),
+        "fetched_at": fetched_at,
+        "generation": generation,
+        "memo": {},
+        "queries": QueryCache(),
+    }
+
+
+def generation_memo(cache: Dict, key: str, factory: Callable[[], Any]) -> Any:
+    """compute a value once per cache generation and keep it on the dataset"""
+    memo = cache["memo"]
+    if key not in memo:
+        memo[key] = factory()
+    return memo[key]
+
+
+def validate_data(raw: Dict, generation: int = 1) -> Dict:
+    """validate raw upstream payloads and build the lookup structures
+
+    Records failing validation are left out and listed under "quarantined".
+    """
+    launches, bad_launches = validate_records(Launch, raw["launches"])
+    rockets, bad_rockets = validate_records(Rocket, raw["rockets"])
+    launchpads, bad_launchpads = validate_records(Launchpad, raw["launchpads"])
+    validated = build_cache(launches, rockets, launchpads, time.time(), generation)
+    validated["quarantined"] = {
+        "launches": bad_launches,
+        "rockets": bad_rockets,
+        "launchpads": bad_launchpads,
+    }
+    return validated
+
+
+def _fingerprint(item: Dict) -> int:
+    return hash(json.dumps(item, sort_keys=True))
 
 
-async def load_all_data():
-    """temp function"""
-    all_data = {
-        "launches": await get_data("launches"),
-        "rockets": await get_data("rockets"),
-        "launchpads": await get_data("launchpads"),
+def merge_launches(
+    launches: List[Launch],
+    fingerprints: Dict[str, int],
+    items: List[Dict],
+    quarantined: Optional[List[Dict]] = None,
+) -> List[Launch]:
+    """merge delta records into the cached launches by id
+
+    Only records whose fingerprint differs from the last merge are
+    revalidated. `fingerprints` is updated in place, records failing
+    validation keep their cached version and go to `quarantined`.
+    """
+    positions = {launch.id: pos for pos, launch in enumerate(launches)}
+    merged = list(launches)
+
+    for item in items:
+        fingerprint = _fingerprint(item)
+        if fingerprints.get(item.get("id")) == fingerprint:
+            continue
+        try:
+            launch = Launch.model_validate(item)
+        except ValidationError as e:
+            errors = [error["msg"] for error in e.errors()]
+            logging.warning(f"quarantined Launch {item.get('id')}: {errors}")
+            if quarantined is not None:
+                quarantined.append(
+                    {"pos": None, "id": item.get("id"), "errors": errors}
+                )
+            continue
+        fingerprints[launch.id] = fingerprint
+        if launch.id in positions:
+            merged[positions[launch.id]] = launch
+        else:
+            positions[launch.id] = len(merged)
+            merged.append(launch)
+
+    return merged
+
+
+def validate_delta(app, raw: Dict, generation: int) -> Dict:
+    """build the next generation from the current cache plus a delta"""
+    fingerprints = dict(app.state.launch_fingerprints)
+    bad_launches: List[Dict] = []
+    launches = merge_launches(
+        launch_records(app.state.cache["launches"]),
+        fingerprints,
+        raw["launches"],
+        bad_launches,
+    )
+    rockets, bad_rockets = validate_records(Rocket, raw["rockets"])
+    launchpads, bad_launchpads = validate_records(Launchpad, raw["launchpads"])
+    validated = build_cache(launches, rockets, launchpads, time.time(), generation)
+    validated["quarantined"] = {
+        "launches": bad_launches,
+        "rockets": bad_rockets,
+        "launchpads": bad_launchpads,
     }
-    return all_data
+    app.state.launch_fingerprints = fingerprints
+    return validated
+
+
+def _delta_due(app) -> bool:
+    if REFRESH_MODE != "incremental" or not isinstance(app.state.cache, dict):
+        return False
+    if not SOURCE.supports_query:
+        return False
+    last_full = getattr(app.state, "last_full_refresh", 0)
+    return time.time() - last_full < FULL_REFRESH_INTERVAL
+
+
+def next_generation(app) -> int:
+    """generation number for the dataset replacing the current one"""
+    cache = app.state.cache
+    return cache["generation"] + 1 if isinstance(cache, dict) else 1
+
+
+def install_cache(app, validated: Dict) -> None:
+    """swap in a new dataset in one assignment, readers keep their snapshot"""
+    app.state.cache = validated
+    app.state.cache_expires = validated["fetched_at"] + CACHE_TTL
+
+
+async def save_snapshot(app, validated: Dict) -> None:
+    """persist a freshly fetched dataset when a snapshot path is configured"""
+    path = getattr(app.state, "snapshot_path", None)
+    # with several workers only the one holding the snapshot lock publishes
+    if not path or not getattr(app.state, "snapshot_leader", True):
+        return
+    try:
+        await asyncio.to_thread(write_snapshot, path, validated)
+    except OSError as e:
+        logging.error(f"writing snapshot {path} failed: {e}")
+
+
+def install_snapshot(app, snapshot: Snapshot) -> None:
+    """install a dataset read back from a snapshot file"""
+    install_cache(
+        app,
+        build_cache(
+            snapshot.launches,
+            snapshot.rockets,
+            snapshot.launchpads,
+            snapshot.fetched_at,
+            snapshot.generation,
+        ),
+    )
+
+
+def restore_snapshot(app) -> bool:
+    """install the on-disk snapshot, if any, as the starting cache"""
+    path = getattr(app.state, "snapshot_path", None)
+    snapshot = read_snapshot(path) if path else None
+    if snapshot is None:
+        return False
+    install_snapshot(app, snapshot)
+    logging.info(f"restored snapshot from {path}")
+    return True
+
+
+async def refresh_cache(app) -> Dict:
+    """fetch and validate fresh data, falls back to stale cache on failure"""
+    delta = _delta_due(app)
+    if delta:
+        raw = await load_delta_data(int(time.time()) - DELTA_WINDOW)
+    else:
+        raw = await load_all_data()
+
+    # using cached data if api fails
+    if raw is None:
+        if app.state.cache is not None:
+            logging.warning("API failed, serving stale cache")
+            REFRESHES.inc("stale")
+            # Extend cache expiry slightly
+            app.state.cache_expires = time.time() + STALE_TTL
+            return app.state.cache
+        # No cache at all, raise error
+        REFRESHES.inc("failed")
+        raise HTTPException(
+            status_code=503,
+            detail="Unable to fetch data from SpaceX API and no cache available",
+        )
+
+    # same principle for validation
+    start = time.perf_counter()
+    try:
+        if delta:
+            validated = validate_delta(app, raw, next_generation(app))
+        else:
+            validated = validate_data(raw, next_generation(app))
+            app.state.launch_fingerprints = {}
+            app.state.last_full_refresh = validated["fetched_at"]
+    except Exception as e:
+        logging.error(f"Data validation failed: {e}")
+        if app.state.cache is not None:
+            logging.warning("Using stale cache due to validation error")
+            REFRESHES.inc("stale")
+            return app.state.cache
+        REFRESHES.inc("failed")
+        raise HTTPException(status_code=500, detail="Data validation failed")
+    finally:
+        # plus the records validated while they were streamed in by get_data
+        streamed = sum(_validation_seconds(part) for part in raw.values())
+        VALIDATION_DURATION.observe(
+            time.perf_counter() - start + streamed, "delta" if delta else "full"
+        )
+
+    REFRESHES.inc("installed")
+    install_cache(app, validated)
+    await save_snapshot(app, validated)
+    return validated
+
+
+async def cache_refresher(app) -> None:
+    """background task renewing the cache ahead of its expiry"""
+    # a restored snapshot may still be fresh, start refreshing when due
+    delay = app.state.cache_expires - REFRESH_AHEAD - time.time()
+    while True:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            async with app.state.cache_lock:
+                await refresh_cache(app)
+        except HTTPException as e:
+            logging.error(f"background refresh failed: {e.detail}")
+
+        delay = max(
+            app.state.cache_expires - REFRESH_AHEAD - time.time(), REFRESH_RETRY
+        )
+
+
+def _refresher_running(app) -> bool:
+    task = getattr(app.state, "refresh_task", None)
+    return task is not None and not task.done()
+
+
+async def _locked_fill(app) -> Dict:
+    async with app.state.cache_lock:
+        # double check, someone may have refreshed while we waited
+        if app.state.cache is not None and time.time() < app.state.cache_expires:
+            return app.state.cache
+        return await refresh_cache(app)
+
+
+async def _single_flight_fill(app) -> Dict:
+    """run at most one cache fill, concurrent callers share its result or error"""
+    fill = getattr(app.state, "cache_fill", None)
+    if fill is None or fill.done():
+        fill = asyncio.create_task(_locked_fill(app))
+        app.state.cache_fill = fill
+    # shielded so a disconnecting client does not cancel the fill for the rest
+    return await asyncio.shield(fill)
 
 
 async def load_cached_data(request: Request) -> Dict:
     try:
         """chack cached data, reloads and validate"""
+        app = request.app
+        cache = app.state.cache
 
-        if (
-            request.app.state.cache is not None
-            and time.time() < request.app.state.cache_expires
-        ):
-            logging.info("serving data from cache")
-            return request.app.state.cache
-
-        async with request.app.state.cache_lock:
-            raw = await load_all_data()
-
-            # using cached data if api fails
-            if raw is None:
-                if request.app.state.cache is not None:
-                    logging.warning("API failed, serving stale cache")
-                    # Extend cache expiry slightly
-                    request.app.state.cache_expires = time.time() + 60
-                    return request.app.state.cache
-                else:
-                    # No cache at all, raise error
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Unable to fetch data from SpaceX API and no cache available",
-                    )
-            # same principle for validation
-            try:
-                validated_launches = [
-                    Launch.model_validate(item) for item in raw["launches"]
-                ]
-                validated_rockets = [
-                    Rocket.model_validate(item) for item in raw["rockets"]
-                ]
-                validated_launchpads = [
-                    Launchpad.model_validate(item) for item in raw["launchpads"]
-                ]
-            except Exception as e:
-                logging.error(f"Data validation failed: {e}")
-                if request.app.state.cache is not None:
-                    logging.warning("Using stale cache due to validation error")
-                    return request.app.state.cache
-                raise HTTPException(status_code=500, detail="Data validation failed")
-
-            validated = {
-                "launches": validated_launches,
-                "rockets": validated_rockets,
-                "launchpads": validated_launchpads,
-            }
-            # validated = [Launch.model_validate(item) for item in raw]
-            request.app.state.cache = validated
-            request.app.state.cache_expires = time.time() + 600
-            return validated
+        # with the refresher running an expired cache is still served,
+        # the renewal happens in the background
+        if cache is not None:
+            if time.time() < app.state.cache_expires:
+                CACHE_REQUESTS.inc("hit")
+                return cache
+            if _refresher_running(app):
+                CACHE_REQUESTS.inc("stale")
+                return cache
+
+        CACHE_REQUESTS.inc("miss")
+        logging.debug("cache empty or expired, filling")
+        return await _single_flight_fill(app)
     except Exception as e:
         logging.error(f"load cached data failed: {e}")
         raise
@@ -4,13 +4,18 @@
 import asyncio
 import logging
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from app.libs import restore_snapshot
+from app.metrics import MetricsMiddleware
 from app.routers import register_routers
+from app.shared import cache_worker
+from app.snapshot import SNAPSHOT_PATH
+from app.sources import start_http_client, stop_http_client
 
 logging.basicConfig(
     level=int(os.getenv("DEBUG_LEVEL")),  # integer in env.
@@ -24,12 +29,21 @@ async def lifespan(ap: FastAPI):
     ap.state.cache = None
     ap.state.cache_expires = 0
     ap.state.cache_lock = asyncio.Lock()
+    ap.state.cache_fill = None
+    ap.state.snapshot_path = SNAPSHOT_PATH
+    restore_snapshot(ap)
+    await start_http_client()
+    ap.state.refresh_task = asyncio.create_task(cache_worker(ap))
 
     try:
         logging.info("Application starting")
         yield
     finally:
         logging.info("Application shutting down")
+        ap.state.refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await ap.state.refresh_task
+        await stop_http_client()
 
 
 app = FastAPI(debug=True, title="FastAPI Quickstart", lifespan=lifespan)
@@ -38,6 +52,7 @@ STATIC_DIR = Path("app/static").resolve()
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 register_routers(app=app)
+app.add_middleware(MetricsMiddleware)
 
 if __name__ == "__main__":
     import uvicorn
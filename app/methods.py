@@ -1,10 +1,27 @@
 """methids used in router"""
 
-from typing import Optional
-
-from fastapi import Request
-
-from app.libs import load_cached_data
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from fastapi import HTTPException, Request, Response
+
+from app.compact import launch_records
+from app.compression import compressed_response
+from app.encoded import encoded_launches, launches_body
+from app.libs import generation_memo, load_cached_data
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.metrics import render_metrics
+from app.models import FilterQuery, Launch
+from app.query_cache import matching_positions, query_key
 
 
 async def healthcheck(request: Request):
@@ -14,14 +31,92 @@ async def healthcheck(request: Request):
     }
 
 
-async def rockets(request: Request):
-    data = await load_cached_data(request)
-    return data["rockets"]
+async def metrics(request: Request) -> Response:
+    """Prometheus exposition, never triggers a cache fill"""
+    cache = getattr(request.app.state, "cache", None)
+    return Response(render_metrics(cache), media_type=METRICS_CONTENT_TYPE)
 
 
-async def launchpads(request: Request):
-    data = await load_cached_data(request)
-    return data["launchpads"]
+async def query_cache_stats(request: Request) -> Dict[str, int]:
+    """hit/miss counters of the filter query cache"""
+    cache = await load_cached_data(request)
+    return cache["queries"].stats()
+
+
+def parse_cursor(after: Optional[str]) -> Optional[Tuple[int, str]]:
+    """`date_unix:id` cursor from the previous page"""
+    if after is None:
+        return None
+    date, _, launch_id = after.partition(":")
+    try:
+        return int(date), launch_id
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail=f"invalid cursor: {after}",
+        )
+
+
+def format_cursor(key: Tuple[int, str]) -> str:
+    return f"{key[0]}:{key[1]}"
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Collection[str] = tuple(Launch.model_fields)
+) -> Optional[Set[str]]:
+    """Launch fields of a comma separated projection, None for all of them
+
+    Fields outside `allowed` (what the output format can carry) are rejected.
+    """
+    if fields is None:
+        return None
+    include = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = include.difference(allowed)
+    if unknown or not include:
+        raise HTTPException(
+            status_code=422,
+            detail=f"unknown fields: {', '.join(sorted(unknown)) or fields}",
+        )
+    return include
+
+
+def query_page(
+    cache: Dict, q: FilterQuery
+) -> Tuple[Optional[Sequence[int]], Optional[str]]:
+    """positions selected by the query and the cursor of the next page
+
+    Without `limit`/`after` every match is returned in cache order, paged
+    queries walk the matches in (date_unix, id) order.
+    """
+    positions = matching_positions(cache, **q.filters())
+    if q.limit is None and q.after is None:
+        return positions, None
+    page, cursor = cache["store"].page(positions, q.limit, parse_cursor(q.after))
+    return page, format_cursor(cursor) if cursor is not None else None
+
+
+def select_launches(cache: Dict, q: FilterQuery) -> List[Launch]:
+    """launches of a cache generation selected by the query"""
+    positions, _ = query_page(cache, q)
+    launches = cache["store"].launches
+    if positions is None:
+        return list(launches)
+    return [launches[pos] for pos in positions]
+
+
+def iter_launches(cache: Dict, q: FilterQuery, resident: bool = False) -> Iterator:
+    """launches selected by the query, produced one at a time for streaming
+
+    The query is resolved right away so errors surface before a response
+    starts. With `resident` the cached LaunchRecords are yielded as they
+    are, enough for consumers that only read scalar fields.
+    """
+    positions, _ = query_page(cache, q)
+    launches = cache["store"].launches
+    source = launch_records(launches) if resident else launches
+    if positions is None:
+        return iter(source)
+    return (source[pos] for pos in positions)
 
 
 async def filter_launches(
@@ -34,25 +129,89 @@ async def filter_launches(
 ):
     """main filter logic"""
     cache = await load_cached_data(request)
-    result = cache["launches"]
-
-    # date range
-    if date_from is not None and date_to is not None:
-        result = [t for t in result if date_from <= int(t.date_unix) <= date_to]
-
-    # Success filter
-    if success is not None:
-        if success.lower() == "true":
-            result = [launch for launch in result if launch.success is True]
-        elif success.lower() == "false":
-            result = [launch for launch in result if launch.success is False]
-
-    # rocket filter
-    if rocket:
-        result = [t for t in result if t.rocket == rocket]
-
-    # launchpad filter
-    if launchpad:
-        result = [t for t in result if t.launchpad == launchpad]
-
-    return result
+    return select_launches(
+        cache,
+        FilterQuery(
+            date_from=date_from,
+            date_to=date_to,
+            success=success,
+            rocket=rocket,
+            launchpad=launchpad,
+        ),
+    )
+
+
+def launches_json(
+    cache: Dict,
+    embed: bool = False,
+    include: Optional[Set[str]] = None,
+    **filters,
+) -> bytes:
+    """filtered launches as a JSON body, projected to `include` if given"""
+    key = query_key(**filters)
+    if key is None and include is None:
+        return launches_body(cache, embed=embed)
+    fields = tuple(sorted(include)) if include is not None else None
+    return cache["queries"].get_or_compute(
+        ("launches", key, embed, fields),
+        lambda: launches_body(
+            cache, matching_positions(cache, **filters), include, embed
+        ),
+    )
+
+
+def body_response(
+    request: Request, cache: Dict, body: bytes, name: str, key: Optional[tuple] = None
+) -> Response:
+    """compressed response whose compressed variants are kept with the body
+
+    Unfiltered bodies (`key` None) live for the whole cache generation,
+    filtered ones in the query cache under their normalized query.
+    """
+
+    def cached(encoding: str, compress) -> bytes:
+        if key is None:
+            return generation_memo(cache, f"{name}.{encoding}", compress)
+        return cache["queries"].get_or_compute((name, key, encoding), compress)
+
+    return compressed_response(request, body, cached)
+
+
+def launches_response(request: Request, cache: Dict, q: FilterQuery) -> Response:
+    filters = q.filters()
+    include = parse_fields(q.fields)
+    if q.limit is None and q.after is None:
+        body = launches_json(cache, q.embed, include, **filters)
+        name = "launches_embedded" if q.embed else "launches"
+        key = query_key(**filters)
+        if include is not None:
+            name, key = f"{name}_fields", (key, tuple(sorted(include)))
+        return body_response(request, cache, body, name, key)
+
+    # pages are cheap slices of the memoized positions
+    positions, cursor = query_page(cache, q)
+    response = compressed_response(
+        request, launches_body(cache, positions, include, q.embed)
+    )
+    return with_cursor(response, cursor)
+
+
+def with_cursor(response: Response, cursor: Optional[str]) -> Response:
+    """announce the next page, if any, in the X-Next-Cursor header"""
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
+    return response
+
+
+def launches_encoded(
+    cache: Dict, q: FilterQuery
+) -> Tuple[Iterable[Launch], Iterable[bytes]]:
+    """selected launches together with their pre-encoded JSON rows, lazily"""
+    store = cache["store"]
+    encoded = encoded_launches(cache)
+    positions, _ = query_page(cache, q)
+    if positions is None:
+        return store.launches, encoded
+    return (store.launches[pos] for pos in positions), (
+        encoded[pos] for pos in positions
+    )
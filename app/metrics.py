@@ -0,0 +1,212 @@
+"""in-process metrics rendered in the Prometheus text format"""
+
+import bisect
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    """monotonic counter per label set"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """cumulative-bucket histogram per label set"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # per label set: counts per bucket (last one is +Inf), then the sum
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self.series.items():
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                total += count
+                le = _labels(self.labels, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {total}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "request latency by route",
+    ("route", "method", "status"),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "dataset lookups by outcome: hit, stale (expired but served) or miss",
+    ("result",),
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_fetch_duration_seconds",
+    "data source fetch duration by endpoint, without the validation",
+    ("endpoint",),
+    FETCH_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_fetch_errors_total",
+    "failed data source fetches by endpoint and error kind",
+    ("endpoint", "kind"),
+)
+UPSTREAM_RETRIES = Counter(
+    "upstream_fetch_retries_total",
+    "data source fetch attempts retried after a transient error",
+    ("endpoint",),
+)
+UPSTREAM_HEDGES = Counter(
+    "upstream_fetch_hedges_total",
+    "second requests raced against a slow data source fetch",
+    ("endpoint",),
+)
+VALIDATION_DURATION = Histogram(
+    "validation_duration_seconds",
+    "time spent validating a fetched dataset, streamed records included",
+    ("mode",),
+)
+REFRESHES = Counter(
+    "cache_refreshes_total",
+    "cache refreshes by outcome: installed, stale (kept old data) or failed",
+    ("result",),
+)
+METRICS = (
+    REQUEST_LATENCY,
+    CACHE_REQUESTS,
+    UPSTREAM_DURATION,
+    UPSTREAM_ERRORS,
+    UPSTREAM_RETRIES,
+    UPSTREAM_HEDGES,
+    VALIDATION_DURATION,
+    REFRESHES,
+)
+
+
+def _gauge(name: str, help: str, samples: Iterable[Tuple[str, float]]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+    return lines
+
+
+def dataset_metrics(cache: Optional[Dict], now: Optional[float] = None) -> List[str]:
+    """gauges describing the installed cache generation"""
+    if not isinstance(cache, dict):
+        return []
+    now = time.time() if now is None else now
+    quarantined = cache.get("quarantined", {})
+    collections = ("launches", "rockets", "launchpads")
+    return [
+        *_gauge(
+            "dataset_records",
+            "records in the cached dataset",
+            ((f'{{collection="{c}"}}', len(cache[c])) for c in collections),
+        ),
+        *_gauge(
+            "dataset_quarantined_records",
+            "records dropped by validation in the cached dataset",
+            (
+                (f'{{collection="{c}"}}', len(quarantined.get(c, ())))
+                for c in collections
+            ),
+        ),
+        *_gauge(
+            "cache_age_seconds",
+            "seconds since the cached dataset was fetched",
+            [("", round(now - cache["fetched_at"], 3))],
+        ),
+        *_gauge(
+            "cache_generation",
+            "generation of the cached dataset",
+            [("", cache["generation"])],
+        ),
+    ]
+
+
+def render_metrics(cache: Optional[Dict] = None) -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(dataset_metrics(cache))
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its matched route
+
+    The route template (not the raw path) is the label, so cardinality stays
+    bounded by the routers registered in app.routers. Streamed responses are
+    timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                getattr(route, "path", "unmatched"),
+                scope["method"],
+                str(status[0]),
+            )
@@ -60,14 +60,46 @@ class Launchpad(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
 
+MAX_PAGE_SIZE = 1000
+FILTER_FIELDS = {
+    "date_from",
+    "date_to",
+    "success",
+    "rocket",
+    "launchpad",
+    "rocket_name",
+    "region",
+}
+
+
 class FilterQuery(BaseModel):
-    """Filtering model"""
+    """Filtering model
+
+    `limit`/`after` page through the matches ordered by (date_unix, id),
+    `after` being the cursor returned with the previous page. `fields` is a
+    comma separated projection of Launch fields (CSV exports take the flat
+    ones only). Paging and projection apply to launch listings and exports,
+    both send the next page's cursor in X-Next-Cursor; stats always cover
+    every match.
+    `rocket_name` and `region` match the joined rocket name and launchpad
+    region case-insensitively, `embed` adds those names to listed launches.
+    """
 
     date_from: Optional[int] = None
     date_to: Optional[int] = None
     success: Optional[str] = None
     rocket: Optional[str] = None
     launchpad: Optional[str] = None
+    rocket_name: Optional[str] = None
+    region: Optional[str] = None
+    limit: Optional[int] = Field(default=None, ge=1, le=MAX_PAGE_SIZE)
+    after: Optional[str] = None
+    fields: Optional[str] = None
+    embed: bool = False
+
+    def filters(self) -> Dict[str, Any]:
+        """the row filters only, without paging and projection"""
+        return self.model_dump(include=FILTER_FIELDS)
 
 
 class ChartData(TypedDict):
@@ -84,3 +116,5 @@ class AnalyticsResponse(TypedDict):
     successByRocket: ChartData
     launchesBySite: ChartData
     frequencyByYear: FrequencyData
+    # launchpad id -> name for the launchesBySite labels
+    launchpadNames: Dict[str, str]
@@ -0,0 +1,105 @@
+"""bounded LRU cache for filter query results"""
+
+import os
+from array import array
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+QUERY_CACHE_ENTRIES = int(os.getenv("QUERY_CACHE_ENTRIES", "256"))
+QUERY_CACHE_BYTES = int(os.getenv("QUERY_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# totals across cache generations, a new dataset starts with an empty cache
+QUERY_CACHE_STATS: Counter = Counter()
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, array):
+        return len(value) * value.itemsize
+    return len(value)
+
+
+class QueryCache:
+    """LRU of query results for one cache generation.
+
+    Lives on the cache dict, so installing a new dataset drops it together
+    with the old one. Evicts by entry count and by the summed size of the
+    stored values (bytes bodies or position arrays).
+    """
+
+    def __init__(
+        self, max_entries: int = QUERY_CACHE_ENTRIES, max_bytes: int = QUERY_CACHE_BYTES
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+
+    def get_or_compute(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            QUERY_CACHE_STATS["hits"] += 1
+            return entry[0]
+
+        QUERY_CACHE_STATS["misses"] += 1
+        value = factory()
+        size = _size(value)
+        if size > self.max_bytes:
+            return value
+
+        self.entries[key] = (value, size)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+            QUERY_CACHE_STATS["evictions"] += 1
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": QUERY_CACHE_STATS["hits"],
+            "misses": QUERY_CACHE_STATS["misses"],
+            "evictions": QUERY_CACHE_STATS["evictions"],
+            "entries": len(self.entries),
+            "bytes": self.size,
+        }
+
+
+def query_key(
+    date_from: Optional[int] = None,
+    date_to: Optional[int] = None,
+    success: Optional[str] = None,
+    rocket: Optional[str] = None,
+    launchpad: Optional[str] = None,
+    rocket_name: Optional[str] = None,
+    region: Optional[str] = None,
+) -> Optional[tuple]:
+    """normalized form of a filter query, None when nothing is filtered
+
+    Mirrors what LaunchStore.positions applies, so queries that select the
+    same rows share one key.
+    """
+    dates = (date_from, date_to) if None not in (date_from, date_to) else None
+    success = success.lower() if success is not None else None
+    if success not in ("true", "false"):
+        success = None
+    key = (
+        dates,
+        success,
+        rocket or None,
+        launchpad or None,
+        rocket_name.casefold() if rocket_name else None,
+        region.casefold() if region else None,
+    )
+    return key if any(part is not None for part in key) else None
+
+
+def matching_positions(cache: Dict, **filters) -> Optional[Sequence[int]]:
+    """positions matching the filters, memoized per cache generation"""
+    key = query_key(**filters)
+    if key is None:
+        return None
+    return cache["queries"].get_or_compute(
+        ("positions", key),
+        lambda: array("l", cache["store"].positions(**filters)),
+    )
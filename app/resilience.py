@@ -0,0 +1,93 @@
+"""guards for upstream calls: jittered backoff, hedging and a circuit breaker"""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+Result = TypeVar("Result")
+
+
+def backoff(retry: int, base: float, cap: float) -> float:
+    """full-jitter delay before `retry` (0 for the first retry)"""
+    return random.uniform(0, min(cap, base * 2**retry))
+
+
+async def hedged(
+    attempt: Callable[[asyncio.Event], Awaitable[Result]],
+    delay: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> Result:
+    """Run `attempt`, racing a second copy if it has no answer after `delay`.
+
+    An attempt sets the event it is given once the upstream started to
+    answer, a slow body is not worth a hedge. The first copy to succeed wins
+    and the other one is cancelled. A copy failing before the hedge is
+    started fails the call, after it the other copy still gets its chance.
+    Only for idempotent requests.
+    """
+    answered = asyncio.Event()
+    tasks = [asyncio.ensure_future(attempt(answered))]
+    try:
+        if delay is not None:
+            waiter = asyncio.ensure_future(answered.wait())
+            try:
+                await asyncio.wait(
+                    [tasks[0], waiter],
+                    timeout=delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                waiter.cancel()
+            if not tasks[0].done() and not answered.is_set():
+                if on_hedge is not None:
+                    on_hedge()
+                tasks.append(asyncio.ensure_future(attempt(asyncio.Event())))
+
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            # a success wins even when a failure finished in the same wakeup
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if not pending:
+                return done.pop().result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker in front of one upstream.
+
+    After `threshold` failures in a row the circuit opens and `allow` turns
+    calls away for `cooldown` seconds. The first calls after that go through
+    (half-open): a success closes the circuit, a failure opens it again.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half-open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def success(self) -> None:
+        self.failures = 0
+        self.open_until = 0.0
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.open_until = time.monotonic() + self.cooldown
@@ -1,13 +1,28 @@
 """FastAPI router setup"""
 
-from typing import Dict, List
-
-from fastapi import APIRouter, Depends, FastAPI, Request, status
-
-from app.analytics import analytics
-from app.export import export_to_csv, export_to_json
-from app.methods import filter_launches, healthcheck, launchpads, rockets
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, Query, Request, Response, status
+
+from app.analytics import analytics_body
+from app.compression import request_encoding
+from app.conditional import conditional_response
+from app.encoded import launchpads_body, rockets_body
+from app.export import CSV_FIELDS, export_to_csv, export_to_json
+from app.methods import (
+    body_response,
+    healthcheck,
+    iter_launches,
+    launches_encoded,
+    launches_response,
+    metrics,
+    parse_fields,
+    query_cache_stats,
+    query_page,
+    with_cursor,
+)
 from app.models import FilterQuery, Launch, Launchpad, Rocket
+from app.query_cache import query_key
 
 API_PREFIX = ""
 
@@ -29,6 +44,22 @@ def _health_checks_router() -> APIRouter:
     return router
 
 
+def _metrics_router() -> APIRouter:
+    """Prometheus metrics"""
+    router = APIRouter(prefix="/metrics", tags=["health"])
+
+    @router.get(
+        "",
+        name="metrics",
+        summary="Prometheus metrics",
+        status_code=status.HTTP_200_OK,
+    )
+    async def metrics_endpoint(request: Request) -> Response:
+        return await metrics(request)
+
+    return router
+
+
 def _filter_launches_router() -> APIRouter:
     """endpoint for queriing the data"""
 
@@ -39,11 +70,16 @@ def _filter_launches_router() -> APIRouter:
         name="launches",
         summary="Launches Endpoint",
         status_code=status.HTTP_200_OK,
+        response_model=List[Launch],
     )
     async def launches_endpoint(
         request: Request, q: FilterQuery = Depends()
-    ) -> List[Launch]:
-        return await filter_launches(request, **q.model_dump())
+    ) -> Response:
+        # served from JSON encoded once per cache generation
+        return await conditional_response(
+            request,
+            lambda cache: launches_response(request, cache, q),
+        )
 
     return router
 
@@ -57,9 +93,15 @@ def _select_rocket_router() -> APIRouter:
         name="rocket",
         summary="data for rocket select dropdown",
         status_code=status.HTTP_200_OK,
+        response_model=List[Rocket],
     )
-    async def select_rocket_endpoint(request: Request) -> List[Rocket]:
-        return await rockets(request)
+    async def select_rocket_endpoint(request: Request) -> Response:
+        return await conditional_response(
+            request,
+            lambda cache: body_response(
+                request, cache, rockets_body(cache), "rockets_body"
+            ),
+        )
 
     return router
 
@@ -73,9 +115,15 @@ def _select_launchpad_router() -> APIRouter:
         name="launchpad",
         summary="data for launchpad select dropdown",
         status_code=status.HTTP_200_OK,
+        response_model=List[Launchpad],
     )
-    async def select_launchpad_endpoint(request: Request) -> List[Launchpad]:
-        return await launchpads(request)
+    async def select_launchpad_endpoint(request: Request) -> Response:
+        return await conditional_response(
+            request,
+            lambda cache: body_response(
+                request, cache, launchpads_body(cache), "launchpads_body"
+            ),
+        )
 
     return router
 
@@ -90,8 +138,37 @@ def _stats_router() -> APIRouter:
         summary="analytics data",
         status_code=status.HTTP_200_OK,
     )
-    async def analytics_endpoint(request: Request) -> Dict:
-        return await analytics(request)
+    async def analytics_endpoint(
+        request: Request, q: FilterQuery = Depends()
+    ) -> Response:
+        # unfiltered stats are precomputed once per cache generation
+        filters = q.filters()
+        return await conditional_response(
+            request,
+            lambda cache: body_response(
+                request,
+                cache,
+                analytics_body(cache, **filters),
+                "analytics",
+                query_key(**filters),
+            ),
+        )
+
+    return router
+
+
+def _cache_stats_router() -> APIRouter:
+    """query cache counters"""
+    router = APIRouter(prefix="/stats/cache", tags=["data"])
+
+    @router.get(
+        "",
+        name="cache_stats",
+        summary="filter query cache counters",
+        status_code=status.HTTP_200_OK,
+    )
+    async def cache_stats_endpoint(request: Request) -> dict[str, int]:
+        return await query_cache_stats(request)
 
     return router
 
@@ -106,17 +183,45 @@ def _export_router() -> APIRouter:
         summary="Export launches to CSV",
     )
     async def export_csv_endpoint(request: Request, q: FilterQuery = Depends()):
-        launches = await filter_launches(request, **q.model_dump())
-        return export_to_csv(launches)
+        # a CSV row has no room for the nested links and failures
+        include = parse_fields(q.fields, CSV_FIELDS)
+
+        def build(cache):
+            response = export_to_csv(
+                iter_launches(cache, q, resident=True),
+                encoding=request_encoding(request),
+                include=include,
+            )
+            return with_cursor(response, query_page(cache, q)[1])
+
+        return await conditional_response(request, build)
 
     @router.get(
         "/json",
         name="export_json",
         summary="Export launches to JSON",
     )
-    async def export_json_endpoint(request: Request, q: FilterQuery = Depends()):
-        launches = await filter_launches(request, **q.model_dump())
-        return export_to_json(launches)
+    async def export_json_endpoint(
+        request: Request,
+        q: FilterQuery = Depends(),
+        fmt: Literal["json", "ndjson"] = Query("json", alias="format"),
+        indent: Optional[int] = Query(2, ge=0, le=8),
+    ):
+        include = parse_fields(q.fields)
+
+        def build(cache):
+            launches, encoded = launches_encoded(cache, q)
+            response = export_to_json(
+                launches,
+                fmt,
+                indent,
+                encoded,
+                request_encoding(request),
+                include=include,
+            )
+            return with_cursor(response, query_page(cache, q)[1])
+
+        return await conditional_response(request, build)
 
     return router
 
@@ -125,10 +230,12 @@ def register_routers(app: FastAPI) -> None:
     """Register all routers on the FastAPI application."""
     routers = [
         _health_checks_router(),
+        _metrics_router(),
         _filter_launches_router(),
         _select_rocket_router(),
         _select_launchpad_router(),
         _stats_router(),
+        _cache_stats_router(),
         _export_router(),
     ]
     for router in routers:
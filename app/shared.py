@@ -0,0 +1,77 @@
+"""cross-worker cache sharing through the snapshot file"""
+
+import asyncio
+import fcntl
+import logging
+import os
+
+from app.libs import cache_refresher, install_snapshot
+from app.snapshot import read_generation, read_snapshot
+
+FOLLOW_INTERVAL = 5
+
+
+def try_lead(app) -> bool:
+    """take the writer lock next to the snapshot, only one worker gets it"""
+    fd = os.open(f"{app.state.snapshot_path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+    app.state.snapshot_lock_fd = fd
+    return True
+
+
+def release_lead(app) -> None:
+    """drop the writer lock so another worker can take over"""
+    fd = getattr(app.state, "snapshot_lock_fd", None)
+    if fd is not None:
+        os.close(fd)
+        app.state.snapshot_lock_fd = None
+
+
+def _published_snapshot(app):
+    """read the published snapshot if it is newer than what we serve"""
+    path = app.state.snapshot_path
+    generation = read_generation(path)
+    cache = app.state.cache
+    if generation is None or (cache is not None and cache["generation"] >= generation):
+        return None
+    return read_snapshot(path)
+
+
+async def follow_snapshot(app) -> bool:
+    """reload the cache when the leader published a new generation"""
+    snapshot = await asyncio.to_thread(_published_snapshot, app)
+    if snapshot is None:
+        return False
+    install_snapshot(app, snapshot)
+    logging.info(f"loaded snapshot generation {snapshot.generation}")
+    return True
+
+
+async def cache_worker(app) -> None:
+    """refresh the cache, or follow the worker that does
+
+    Without a snapshot path every worker refreshes on its own. With one, the
+    worker holding the snapshot lock fetches and publishes, the others only
+    map the file whenever its generation changes and take over the lock if
+    the leader goes away.
+    """
+    if not app.state.snapshot_path:
+        return await cache_refresher(app)
+
+    app.state.snapshot_leader = False
+    try:
+        while not try_lead(app):
+            await follow_snapshot(app)
+            await asyncio.sleep(FOLLOW_INTERVAL)
+
+        app.state.snapshot_leader = True
+        logging.info("this worker refreshes the shared snapshot")
+        # pick up whatever the previous leader published last
+        await follow_snapshot(app)
+        await cache_refresher(app)
+    finally:
+        release_lead(app)
@@ -0,0 +1,139 @@
+"""on-disk snapshot of the validated dataset"""
+
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from pydantic import TypeAdapter
+
+from app.models import Launch, Launchpad, Rocket
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+SNAPSHOT_MAGIC = b"PXSNAP"
+SNAPSHOT_VERSION = 2
+# magic, version, generation, fetched_at, then byte length of each JSON section
+HEADER = struct.Struct("<6sHQdQQQ")
+SECTIONS = ("launches", "rockets", "launchpads")
+
+LAUNCHES = TypeAdapter(List[Launch])
+ROCKETS = TypeAdapter(List[Rocket])
+LAUNCHPADS = TypeAdapter(List[Launchpad])
+
+
+class Snapshot(NamedTuple):
+    launches: List[Launch]
+    rockets: List[Rocket]
+    launchpads: List[Launchpad]
+    fetched_at: float
+    generation: int
+
+
+def encode_snapshot(cache: Dict) -> bytes:
+    """serialize a cache dict into the versioned snapshot format"""
+    sections = [
+        LAUNCHES.dump_json(list(cache["launches"])),
+        ROCKETS.dump_json(cache["rockets"]),
+        LAUNCHPADS.dump_json(cache["launchpads"]),
+    ]
+    header = HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        cache["generation"],
+        cache["fetched_at"],
+        *(len(section) for section in sections),
+    )
+    return b"".join([header, *sections])
+
+
+def _decode_header(data) -> tuple:
+    if len(data) < HEADER.size:
+        raise ValueError("snapshot truncated")
+    magic, version, generation, fetched_at, *sizes = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("not a snapshot file")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot version {version} not supported")
+    return generation, fetched_at, sizes
+
+
+def _sections(data) -> tuple:
+    """header fields and the (start, end) of each section, in SECTIONS order"""
+    generation, fetched_at, sizes = _decode_header(data)
+    if HEADER.size + sum(sizes) != len(data):
+        raise ValueError("snapshot truncated")
+
+    offset = HEADER.size
+    sections = []
+    for size in sizes:
+        sections.append((offset, offset + size))
+        offset += size
+    return generation, fetched_at, sections
+
+
+def decode_snapshot(data) -> Snapshot:
+    """parse snapshot bytes, raises ValueError for foreign or outdated files"""
+    generation, fetched_at, bounds = _sections(data)
+    sections = [data[start:end] for start, end in bounds]
+    return Snapshot(
+        launches=LAUNCHES.validate_json(sections[0]),
+        rockets=ROCKETS.validate_json(sections[1]),
+        launchpads=LAUNCHPADS.validate_json(sections[2]),
+        fetched_at=fetched_at,
+        generation=generation,
+    )
+
+
+def write_snapshot(path: str, cache: Dict) -> None:
+    """write the snapshot next to its target and rename it into place"""
+    data = encode_snapshot(cache)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def iter_section(path: str, name: str, chunk_size: int) -> Iterator[bytes]:
+    """raw JSON of one collection in a snapshot, in chunks off the mapping
+
+    Raises OSError/ValueError, unlike read_snapshot.
+    """
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        start, end = _sections(data)[2][SECTIONS.index(name)]
+        for offset in range(start, end, chunk_size):
+            yield data[offset : min(offset + chunk_size, end)]
+
+
+def read_generation(path: str) -> Optional[int]:
+    """generation of the published snapshot, reads the header only"""
+    try:
+        with open(path, "rb") as f:
+            return _decode_header(f.read(HEADER.size))[0]
+    except (OSError, ValueError):
+        return None
+
+
+def read_snapshot(path: str) -> Optional[Snapshot]:
+    """load a snapshot, None when it is missing or unusable"""
+    try:
+        # mapped read-only, the pages are shared with every worker reading it
+        with open(path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            return decode_snapshot(data)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"ignoring snapshot {path}: {e}")
+        return None
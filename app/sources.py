@@ -0,0 +1,186 @@
+"""where raw collections come from: the SpaceX API or local files"""
+
+import asyncio
+import os
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Union
+
+import httpx
+
+from app.snapshot import SNAPSHOT_MAGIC, iter_section
+
+HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+HTTP_TIMEOUT = 30
+HTTP_LIMITS = httpx.Limits(
+    max_connections=10, max_keepalive_connections=5, keepalive_expiry=60
+)
+
+# local files are read in chunks of this size
+CHUNK_SIZE = 256 * 1024
+
+Payload = Union[bytes, List]
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """open the application-wide pooled client, called from lifespan"""
+    global HTTP_CLIENT
+    if HTTP_CLIENT is None:
+        HTTP_CLIENT = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return HTTP_CLIENT
+
+
+async def stop_http_client() -> None:
+    """close the pooled client and drop its keep-alive connections"""
+    global HTTP_CLIENT
+    if HTTP_CLIENT is not None:
+        await HTTP_CLIENT.aclose()
+        HTTP_CLIENT = None
+
+
+class DataSource:
+    """Provider of the raw launches, rockets and launchpads collections.
+
+    `fetch` returns a collection as its undecoded JSON array, or as decoded
+    records for query results, `stream` yields the JSON array in chunks as
+    it is read. Both raise on failure - app.libs.get_data turns errors into
+    None. Sources without `supports_query` only serve whole collections, so
+    incremental refreshes fall back to full ones. Only `remote` sources are
+    guarded by timeouts, retries and the circuit breaker.
+    """
+
+    supports_query = False
+    remote = False
+
+    async def fetch(self, endpoint: str, query: Optional[Dict] = None) -> Payload:
+        raise NotImplementedError
+
+    async def stream(self, endpoint: str) -> AsyncIterator[bytes]:
+        yield await self.fetch(endpoint)
+
+
+class HttpSource(DataSource):
+    """the SpaceX REST API, through the pooled client when it is open"""
+
+    supports_query = True
+    remote = True
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    async def fetch(self, endpoint: str, query: Optional[Dict] = None) -> Payload:
+        if HTTP_CLIENT is not None:
+            return await self._fetch(HTTP_CLIENT, endpoint, query)
+        # no app lifespan around us (scripts, tests) - use a one-off client
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+            return await self._fetch(client, endpoint, query)
+
+    async def stream(self, endpoint: str) -> AsyncIterator[bytes]:
+        if HTTP_CLIENT is not None:
+            async for chunk in self._stream(HTTP_CLIENT, endpoint):
+                yield chunk
+            return
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+            async for chunk in self._stream(client, endpoint):
+                yield chunk
+
+    async def _stream(
+        self, client: httpx.AsyncClient, endpoint: str
+    ) -> AsyncIterator[bytes]:
+        async with client.stream("GET", f"{self.base_url}/{endpoint}") as resp:
+            resp.raise_for_status()
+            async for chunk in resp.aiter_bytes():
+                yield chunk
+
+    async def _fetch(
+        self, client: httpx.AsyncClient, endpoint: str, query: Optional[Dict]
+    ) -> Payload:
+        if query is None:
+            resp = await client.get(f"{self.base_url}/{endpoint}")
+            resp.raise_for_status()
+            # raw body, decoded and validated in one pass by validate_data
+            return resp.content
+
+        resp = await client.post(
+            f"{self.base_url}/{endpoint}/query",
+            json={"query": query, "options": {"pagination": False}},
+        )
+        resp.raise_for_status()
+        return resp.json()["docs"]
+
+
+def _read_ndjson(path: str) -> Iterator[bytes]:
+    """NDJSON lines as chunks of one JSON array, without decoding a record"""
+    with open(path, "rb") as f:
+        chunk, separator = [b"["], b""
+        size = 0
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            chunk += (separator, line)
+            separator = b","
+            size += len(line)
+            if size >= CHUNK_SIZE:
+                yield b"".join(chunk)
+                chunk, size = [], 0
+        chunk.append(b"]")
+        yield b"".join(chunk)
+
+
+def _read_json(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+READERS = ((".json", _read_json), (".ndjson", _read_ndjson), (".jsonl", _read_ndjson))
+
+
+class LocalSource(DataSource):
+    """Collections read from disk, for offline runs and bulk archives.
+
+    `path` is either a snapshot file written by app.snapshot (memory-mapped,
+    each section read as JSON) or a directory holding one
+    `<endpoint>.json` array or `<endpoint>.ndjson` file per collection.
+    Files are re-read on every fetch, so replacing them is picked up by the
+    next refresh.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def fetch(self, endpoint: str, query: Optional[Dict] = None) -> Payload:
+        if query is not None:
+            raise ValueError("local data sources do not support queries")
+        return await asyncio.to_thread(lambda: b"".join(self.read(endpoint)))
+
+    async def stream(self, endpoint: str) -> AsyncIterator[bytes]:
+        chunks = self.read(endpoint)
+        try:
+            # blocking reads stay off the event loop
+            while chunk := await asyncio.to_thread(next, chunks, b""):
+                yield chunk
+        finally:
+            chunks.close()
+
+    def read(self, endpoint: str) -> Iterator[bytes]:
+        """the collection's JSON array in chunks"""
+        if os.path.isfile(self.path):
+            with open(self.path, "rb") as f:
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    raise ValueError(f"{self.path} is not a snapshot file")
+            return iter_section(self.path, endpoint, CHUNK_SIZE)
+
+        for suffix, reader in READERS:
+            path = os.path.join(self.path, f"{endpoint}{suffix}")
+            if os.path.exists(path):
+                return reader(path)
+        raise FileNotFoundError(f"no {endpoint} collection in {self.path}")
+
+
+def data_source(spec: str) -> DataSource:
+    """source for a DATA_SOURCE value: an http(s) base URL or a local path"""
+    if spec.startswith(("http://", "https://")):
+        return HttpSource(spec)
+    if spec.startswith("file://"):
+        spec = spec[len("file://") :]
+    return LocalSource(spec)
@@ -0,0 +1,173 @@
+"""columnar launch store with secondary indexes"""
+
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.compact import launch_records
+from app.models import Launch, Launchpad, Rocket
+
+
+class LaunchStore:
+    """Column view over validated launches, built once per cache refresh.
+
+    Launches are referenced by their position in the cached list. Dates are
+    kept sorted for bisecting, the remaining filters are hash indexes of
+    position sets so a query becomes a set intersection. The numpy columns
+    (indexed by position) feed the vectorized aggregations in app.analytics.
+
+    Rockets and launchpads are joined in by id, so names can be resolved and
+    launches filtered by rocket name or launchpad region without a lookup
+    per request.
+    """
+
+    def __init__(
+        self,
+        launches: Sequence[Launch],
+        rockets: Sequence[Rocket] = (),
+        launchpads: Sequence[Launchpad] = (),
+    ):
+        self.launches = launches
+        self.rockets_by_id: Dict[str, Rocket] = {r.id: r for r in rockets}
+        self.launchpads_by_id: Dict[str, Launchpad] = {p.id: p for p in launchpads}
+        self.rocket_names = {r.id: r.name for r in rockets}
+        self.launchpad_names = {p.id: p.name for p in launchpads}
+        # scalar fields are read from the resident records, no materializing
+        launches = launch_records(launches)
+        self.order = sorted(range(len(launches)), key=lambda i: launches[i].date_unix)
+        self.dates = [launches[i].date_unix for i in self.order]
+        self.by_rocket: Dict[str, Set[int]] = {}
+        self.by_launchpad: Dict[str, Set[int]] = {}
+        self.by_success: Dict[Optional[bool], Set[int]] = {}
+
+        rocket_codes: Dict[str, int] = {}
+        launchpad_codes: Dict[str, int] = {}
+        rockets, launchpads, success, years, months = [], [], [], [], []
+
+        for pos, launch in enumerate(launches):
+            self.by_rocket.setdefault(launch.rocket, set()).add(pos)
+            self.by_launchpad.setdefault(launch.launchpad, set()).add(pos)
+            self.by_success.setdefault(launch.success, set()).add(pos)
+
+            rockets.append(rocket_codes.setdefault(launch.rocket, len(rocket_codes)))
+            launchpads.append(
+                launchpad_codes.setdefault(launch.launchpad, len(launchpad_codes))
+            )
+            success.append(1 if launch.success else 0)
+            t = time.gmtime(launch.date_unix)
+            years.append(t.tm_year)
+            months.append(t.tm_mon - 1)
+
+        # code -> id, codes are assigned in order of first appearance
+        self.rocket_ids = list(rocket_codes)
+        self.launchpad_ids = list(launchpad_codes)
+        self.rocket_col = np.array(rockets, dtype=np.int32)
+        self.launchpad_col = np.array(launchpads, dtype=np.int32)
+        self.success_col = np.array(success, dtype=np.int8)
+        self.year_col = np.array(years, dtype=np.int32)
+        self.month_col = np.array(months, dtype=np.int8)
+
+        # keyset order for paging, (date_unix, id) is unique per launch
+        self.page_order = sorted(
+            range(len(launches)), key=lambda i: (launches[i].date_unix, launches[i].id)
+        )
+        self.page_keys = [
+            (launches[i].date_unix, launches[i].id) for i in self.page_order
+        ]
+        self.page_rank = [0] * len(launches)
+        for rank, pos in enumerate(self.page_order):
+            self.page_rank[pos] = rank
+
+        # joined filters, keyed case-insensitively
+        self.by_rocket_name: Dict[str, Set[int]] = {}
+        for rocket_id, rows in self.by_rocket.items():
+            rocket = self.rockets_by_id.get(rocket_id)
+            if rocket is not None:
+                self.by_rocket_name.setdefault(rocket.name.casefold(), set()).update(
+                    rows
+                )
+        self.by_region: Dict[str, Set[int]] = {}
+        for launchpad_id, rows in self.by_launchpad.items():
+            launchpad = self.launchpads_by_id.get(launchpad_id)
+            if launchpad is not None:
+                self.by_region.setdefault(launchpad.region.casefold(), set()).update(
+                    rows
+                )
+
+    def date_range(self, date_from: int, date_to: int) -> Set[int]:
+        """positions of launches with date_from <= date_unix <= date_to"""
+        lo = bisect_left(self.dates, date_from)
+        hi = bisect_right(self.dates, date_to)
+        return set(self.order[lo:hi])
+
+    def positions(
+        self,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        success: Optional[str] = None,
+        rocket: Optional[str] = None,
+        launchpad: Optional[str] = None,
+        rocket_name: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> Optional[List[int]]:
+        """sorted positions matching all given filters, None when unfiltered"""
+        candidates: List[Set[int]] = []
+
+        if date_from is not None and date_to is not None:
+            candidates.append(self.date_range(date_from, date_to))
+
+        if success is not None:
+            if success.lower() == "true":
+                candidates.append(self.by_success.get(True, set()))
+            elif success.lower() == "false":
+                candidates.append(self.by_success.get(False, set()))
+
+        if rocket:
+            candidates.append(self.by_rocket.get(rocket, set()))
+
+        if launchpad:
+            candidates.append(self.by_launchpad.get(launchpad, set()))
+
+        if rocket_name:
+            candidates.append(self.by_rocket_name.get(rocket_name.casefold(), set()))
+
+        if region:
+            candidates.append(self.by_region.get(region.casefold(), set()))
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=len)
+        return sorted(candidates[0].intersection(*candidates[1:]))
+
+    def page(
+        self,
+        positions: Optional[Sequence[int]],
+        limit: Optional[int] = None,
+        after: Optional[Tuple[int, str]] = None,
+    ) -> Tuple[List[int], Optional[Tuple[int, str]]]:
+        """one page of `positions` in (date_unix, id) order after the cursor
+
+        Returns the page and the cursor of its last row when more may follow.
+        """
+        if positions is None:
+            ordered = self.page_order
+            keys = self.page_keys
+        else:
+            ordered = sorted(positions, key=self.page_rank.__getitem__)
+            keys = [self.page_keys[self.page_rank[pos]] for pos in ordered]
+
+        start = bisect_right(keys, after) if after is not None else 0
+        end = len(ordered) if limit is None else start + limit
+        page = ordered[start:end]
+        cursor = keys[end - 1] if end < len(ordered) and page else None
+        return page, cursor
+
+    def select(self, **filters) -> List[Launch]:
+        """return launches matching all given filters, in cache order"""
+        positions = self.positions(**filters)
+        if positions is None:
+            return list(self.launches)
+        return [self.launches[pos] for pos in positions]
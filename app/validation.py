@@ -0,0 +1,174 @@
+"""bulk validation of upstream collections with per-record quarantine"""
+
+import codecs
+import json
+import logging
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.models import Launch, Launchpad, Rocket
+
+Model = TypeVar("Model", bound=BaseModel)
+
+# one adapter per collection, built once - the schema is compiled up front
+ADAPTERS: Dict[Type[BaseModel], TypeAdapter] = {
+    Launch: TypeAdapter(List[Launch]),
+    Rocket: TypeAdapter(List[Rocket]),
+    Launchpad: TypeAdapter(List[Launchpad]),
+}
+DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class Validated(NamedTuple):
+    """a collection already validated while it was read, see RecordStream
+
+    `seconds` is the time spent decoding and validating it, set by the reader.
+    """
+
+    records: List
+    quarantined: List[Dict[str, Any]]
+    seconds: float = 0.0
+
+
+def _quarantine(model: Type[BaseModel], pos: int, item: Any, errors: List[str]) -> Dict:
+    record_id = item.get("id") if isinstance(item, dict) else None
+    logging.warning(f"quarantined {model.__name__} {record_id or pos}: {errors}")
+    return {"pos": pos, "id": record_id, "errors": errors}
+
+
+def validate_records(
+    model: Type[Model], payload: Union[bytes, str, List[Dict], Validated]
+) -> Tuple[List[Model], List[Dict[str, Any]]]:
+    """validate a whole collection, raw JSON or already decoded
+
+    The happy path is a single `validate_json` over the response body. When
+    some records fail, only those are dropped and returned as quarantined
+    (position, id and errors), the rest of the batch is kept. A payload that
+    is not a JSON array, or whose records all fail, raises ValidationError.
+    Collections validated by a RecordStream are passed through.
+    """
+    if isinstance(payload, Validated):
+        return payload.records, payload.quarantined
+    adapter = ADAPTERS[model]
+    raw = isinstance(payload, (bytes, str))
+    try:
+        if raw:
+            return adapter.validate_json(payload), []
+        return adapter.validate_python(payload), []
+    except ValidationError as e:
+        errors: Dict[int, List[str]] = {}
+        for error in e.errors():
+            if not error["loc"] or not isinstance(error["loc"][0], int):
+                raise  # not a list of records at all
+            errors.setdefault(error["loc"][0], []).append(error["msg"])
+
+        items = json.loads(payload) if raw else payload
+        if len(errors) == len(items):
+            raise
+
+    valid, quarantined = [], []
+    for pos, item in enumerate(items):
+        if pos in errors:
+            quarantined.append(_quarantine(model, pos, item, errors[pos]))
+        else:
+            valid.append(model.model_validate(item))
+    return valid, quarantined
+
+
+class RecordStream:
+    """Incremental validation of a JSON array of records fed in chunks.
+
+    Every element is decoded and validated on its own as soon as its bytes
+    are in, and handed to `transform` (e.g. compaction), so the body is never
+    held as a whole - only the records kept so far and one partial element.
+    Failing records are quarantined like in validate_records; `close` raises
+    for a body that is not a JSON array or whose records all fail.
+    """
+
+    def __init__(self, model: Type[Model], transform: Optional[Callable] = None):
+        self.model = model
+        self.transform = transform
+        self.records: List = []
+        self.quarantined: List[Dict[str, Any]] = []
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # "start" before "[", "first"/"value" before an element, "next"
+        # after one and "end" after "]"
+        self._state = "start"
+        self._count = 0
+        self._error: Optional[ValidationError] = None
+
+    def feed(self, chunk: bytes) -> None:
+        self._buffer += self._decoder.decode(chunk)
+        self._parse(final=False)
+
+    def close(self) -> Validated:
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._parse(final=True)
+        if self._state != "end":
+            raise json.JSONDecodeError("Expecting ']'", self._buffer, 0)
+        if self._error is not None and not self.records:
+            raise self._error
+        return Validated(self.records, self.quarantined)
+
+    def _parse(self, final: bool) -> None:
+        buf, idx = self._buffer, 0
+        while True:
+            idx = WHITESPACE.match(buf, idx).end()
+            if idx == len(buf):
+                break
+            char = buf[idx]
+            if self._state == "start":
+                if char != "[":
+                    raise json.JSONDecodeError("Expecting '['", buf, idx)
+                self._state = "first"
+                idx += 1
+            elif self._state in ("first", "next") and char == "]":
+                self._state = "end"
+                idx += 1
+            elif self._state == "next":
+                if char != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, idx)
+                self._state = "value"
+                idx += 1
+            elif self._state == "end":
+                raise json.JSONDecodeError("Extra data", buf, idx)
+            else:
+                try:
+                    item, end = DECODER.raw_decode(buf, idx)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break  # the element is still incomplete
+                if end == len(buf) and not final:
+                    break  # a number could go on in the next chunk
+                self._add(item)
+                self._state = "next"
+                idx = end
+        self._buffer = buf[idx:]
+
+    def _add(self, item: Any) -> None:
+        pos = self._count
+        self._count += 1
+        try:
+            record = self.model.model_validate(item)
+        except ValidationError as e:
+            self._error = e
+            errors = [error["msg"] for error in e.errors()]
+            self.quarantined.append(_quarantine(self.model, pos, item, errors))
+            return
+        self.records.append(self.transform(record) if self.transform else record)
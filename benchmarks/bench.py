@@ -0,0 +1,313 @@
+"""benchmark harness for the cache fill, filter, stats and export paths
+
+Replays the tests/mock fixture, optionally scaled, and synthetic datasets
+through an ASGI client with the SpaceX API stubbed by respx, and reports
+throughput, latency percentiles and peak traced memory per scenario:
+
+    python -m benchmarks.bench --scales 1,10,100 --save bench.json
+    python -m benchmarks.bench --scales 1,10,100 --baseline bench.json
+    python -m benchmarks.bench --scales 1 --synthetic 100000,300000
+
+With --baseline the run fails (exit 1) when a scenario's median latency
+regressed by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import respx
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from app.libs import BASE_URL, load_cached_data
+from app.metrics import MetricsMiddleware
+from app.query_cache import QueryCache
+from app.routers import register_routers
+from app.sources import start_http_client, stop_http_client
+from benchmarks.datasets import ENDPOINTS, encode, load_fixture, scale_fixture
+from benchmarks.synthetic import generate_dataset
+
+Call = Callable[[], Awaitable[None]]
+
+
+def build_app() -> FastAPI:
+    """the production routers and middleware, without lifespan tasks"""
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.state.cache_fill = None
+    register_routers(app)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def filter_mixes(raw: Dict[str, List[Dict]]) -> List[Tuple[str, str]]:
+    """query strings covering each predicate and the usual combinations"""
+    launches = raw["launches"]
+    rocket = Counter(t["rocket"] for t in launches).most_common(1)[0][0]
+    launchpad = Counter(t["launchpad"] for t in launches).most_common(1)[0][0]
+    dates = sorted(t["date_unix"] for t in launches)
+    date_from, date_to = dates[len(dates) // 4], dates[3 * len(dates) // 4]
+    dates_query = f"date_from={date_from}&date_to={date_to}"
+    return [
+        ("none", ""),
+        ("success", "success=true"),
+        ("rocket", f"rocket={rocket}"),
+        ("launchpad", f"launchpad={launchpad}"),
+        ("dates", dates_query),
+        ("rocket+success", f"rocket={rocket}&success=false"),
+        ("dates+launchpad", f"{dates_query}&launchpad={launchpad}"),
+        ("all", f"{dates_query}&rocket={rocket}&launchpad={launchpad}&success=true"),
+        ("page", "limit=100"),
+        ("fields", "fields=id,name,date_unix"),
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """nearest-rank percentile of unsorted values"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def measure(
+    dataset: str,
+    name: str,
+    call: Call,
+    iterations: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict:
+    """time `iterations` sequential calls, then one traced call for memory"""
+    latencies = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+
+    # tracing slows allocation down, so it is kept out of the timed runs
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        await call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "dataset": dataset,
+        "scenario": name,
+        "iterations": iterations,
+        "rps": iterations / sum(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def _get(client: AsyncClient, url: str, headers: Dict[str, str]) -> Call:
+    async def call() -> None:
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+
+    return call
+
+
+def _stream(client: AsyncClient, url: str, headers: Dict[str, str]) -> Call:
+    async def call() -> None:
+        async with client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+            async for _ in response.aiter_raw():
+                pass
+
+    return call
+
+
+async def run_dataset(
+    dataset: Dict[str, List[Dict]],
+    label: str,
+    iterations: int,
+    accept_encoding: str,
+    cold_queries: bool,
+) -> List[Dict]:
+    bodies = encode(dataset)
+    app = build_app()
+    request = Request({"type": "http", "app": app})
+    headers = {"Accept-Encoding": accept_encoding}
+    results = []
+
+    def reset_cache() -> None:
+        app.state.cache = None
+        app.state.cache_expires = 0
+
+    def reset_queries() -> None:
+        # every query computed from scratch, generation-wide bodies stay warm
+        app.state.cache["queries"] = QueryCache()
+
+    query_setup = reset_queries if cold_queries else None
+
+    async def fill() -> None:
+        await load_cached_data(request)
+
+    with respx.mock(assert_all_called=False) as mock:
+        for name in ENDPOINTS:
+            mock.get(f"{BASE_URL}/{name}").mock(
+                return_value=httpx.Response(200, content=bodies[name])
+            )
+        await start_http_client()
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://bench") as ac:
+                # a cold fill fetches, validates and indexes the whole dataset
+                results.append(
+                    await measure(
+                        label, "fill/cold", fill, max(3, iterations // 10), reset_cache
+                    )
+                )
+                results.append(await measure(label, "fill/warm", fill, iterations))
+
+                for name, query in filter_mixes(dataset):
+                    results.append(
+                        await measure(
+                            label,
+                            f"filter/{name}",
+                            _get(ac, f"/launches/filter?{query}", headers),
+                            iterations,
+                            query_setup,
+                        )
+                    )
+
+                for name, url in (
+                    ("all", "/stats/data"),
+                    ("success", "/stats/data?success=true"),
+                ):
+                    results.append(
+                        await measure(
+                            label,
+                            f"stats/{name}",
+                            _get(ac, url, headers),
+                            iterations,
+                            query_setup,
+                        )
+                    )
+
+                for name, url in (
+                    ("csv", "/export/csv"),
+                    ("json", "/export/json"),
+                    ("ndjson", "/export/json?format=ndjson"),
+                ):
+                    results.append(
+                        await measure(
+                            label,
+                            f"export/{name}",
+                            _stream(ac, url, headers),
+                            max(3, iterations // 10),
+                        )
+                    )
+        finally:
+            await stop_http_client()
+    return results
+
+
+def report(results: List[Dict]) -> str:
+    header = (
+        f"{'dataset':>10} {'scenario':<24} {'n':>5} {'req/s':>10} {'p50 ms':>9} "
+        f"{'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'peak KiB':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['dataset']:>10} {r['scenario']:<24} {r['iterations']:>5} "
+            f"{r['rps']:>10.1f} {r['p50_ms']:>9.3f} {r['p90_ms']:>9.3f} "
+            f"{r['p99_ms']:>9.3f} {r['max_ms']:>9.3f} {r['peak_kib']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def regressions(
+    results: List[Dict], baseline: List[Dict], tolerance: float
+) -> List[str]:
+    """scenarios whose median latency grew by more than `tolerance`"""
+    before = {(r["dataset"], r["scenario"]): r for r in baseline}
+    found = []
+    for r in results:
+        old = before.get((r["dataset"], r["scenario"]))
+        if old is not None and r["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            found.append(
+                f"{r['dataset']} {r['scenario']}: p50 {old['p50_ms']:.3f} -> "
+                f"{r['p50_ms']:.3f} ms"
+            )
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1,10", help="fixture multipliers")
+    parser.add_argument(
+        "--synthetic", default="", help="sizes of generated datasets, e.g. 100000"
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--accept-encoding", default="gzip")
+    parser.add_argument(
+        "--cold-queries",
+        action="store_true",
+        help="empty the query cache before every filter/stats request",
+    )
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    raw = load_fixture()
+    datasets = [
+        (f"x{scale}", lambda scale=scale: scale_fixture(raw, scale))
+        for scale in (int(s) for s in args.scales.split(",") if s)
+    ]
+    datasets += [
+        (f"n={n}", lambda n=n: generate_dataset(n))
+        for n in (int(s) for s in args.synthetic.split(",") if s)
+    ]
+
+    results: List[Dict] = []
+    for label, build in datasets:
+        results.extend(
+            asyncio.run(
+                run_dataset(
+                    build(),
+                    label,
+                    args.iterations,
+                    args.accept_encoding,
+                    args.cold_queries,
+                )
+            )
+        )
+    print(report(results))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
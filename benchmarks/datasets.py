@@ -0,0 +1,43 @@
+"""benchmark datasets: the recorded fixture and scaled copies of it"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+MOCK_DIR = Path(__file__).resolve().parent.parent / "tests" / "mock"
+ENDPOINTS = ("launches", "rockets", "launchpads")
+# shift between copies so scaled launches keep distinct dates
+COPY_SHIFT = 7 * 24 * 3600
+
+
+def load_fixture() -> Dict[str, List[Dict]]:
+    """the recorded SpaceX payloads from tests/mock"""
+    return {
+        name: json.loads((MOCK_DIR / f"{name}.json").read_text()) for name in ENDPOINTS
+    }
+
+
+def scale_fixture(raw: Dict[str, List[Dict]], factor: int) -> Dict[str, List[Dict]]:
+    """`factor` copies of the fixture launches with unique ids and dates
+
+    Rockets and launchpads are kept as they are, so the copies spread over
+    the same foreign keys like a longer launch history would.
+    """
+    if factor <= 1:
+        return raw
+    launches = []
+    for copy in range(factor):
+        for launch in raw["launches"]:
+            launches.append(
+                {
+                    **launch,
+                    "id": f"{launch['id']}-{copy}" if copy else launch["id"],
+                    "date_unix": launch["date_unix"] + copy * COPY_SHIFT,
+                }
+            )
+    return {**raw, "launches": launches}
+
+
+def encode(raw: Dict[str, List[Dict]]) -> Dict[str, bytes]:
+    """upstream response bodies for the stubbed API"""
+    return {name: json.dumps(raw[name]).encode() for name in ENDPOINTS}
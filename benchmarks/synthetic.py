@@ -0,0 +1,127 @@
+"""synthetic launch-like datasets of arbitrary size
+
+Records follow the upstream SpaceX shapes validated by app.models, with a
+few rockets and launchpads shared by many launches the way a real feed
+looks. Generation is deterministic for a given seed.
+"""
+
+import random
+import time
+from typing import Dict, List
+
+# 2006-01-01, the first Falcon 1 attempt
+START_UNIX = 1136073600
+ROCKETS = ("Falcon 1", "Falcon 9", "Falcon Heavy", "Starship", "Electron")
+LAUNCHPADS = (
+    ("VAFB SLC 4E", "Vandenberg Space Force Base", "California", 34.63, -120.61),
+    ("CCSFS SLC 40", "Cape Canaveral", "Florida", 28.56, -80.57),
+    ("KSC LC 39A", "Cape Canaveral", "Florida", 28.60, -80.60),
+    ("STLS", "Boca Chica Village", "Texas", 25.99, -97.15),
+    ("Kwajalein Atoll", "Omelek Island", "Marshall Islands", 9.05, 167.74),
+    ("LC-1A", "Mahia Peninsula", "Hawke's Bay", -39.26, 177.86),
+)
+FAILURE_REASONS = ("engine shutdown", "stage separation", "guidance", "fairing")
+
+
+def _id(prefix: str, n: int) -> str:
+    """24 hex chars like the upstream ObjectIds"""
+    return f"{prefix}{n:0{24 - len(prefix)}x}"
+
+
+def generate_rockets() -> List[Dict]:
+    return [
+        {"id": _id("r", i), "name": name, "type": "rocket", "active": True}
+        for i, name in enumerate(ROCKETS)
+    ]
+
+
+def generate_launchpads() -> List[Dict]:
+    return [
+        {
+            "id": _id("p", i),
+            "name": name,
+            "full_name": f"{locality} {name}",
+            "locality": locality,
+            "region": region,
+            "latitude": latitude,
+            "longitude": longitude,
+            "launches": [],
+            "status": "active",
+        }
+        for i, (name, locality, region, latitude, longitude) in enumerate(LAUNCHPADS)
+    ]
+
+
+def generate_launches(
+    n: int, rockets: List[Dict], launchpads: List[Dict], seed: int = 0
+) -> List[Dict]:
+    """`n` launches over the given rockets and launchpads, in date order
+
+    Rocket and launchpad use is skewed towards the first entries, success is
+    mostly true with some failures and unknown (upcoming) outcomes, and the
+    free-form `links` tree carries the usual upstream keys.
+    """
+    rng = random.Random(seed)
+    rocket_weights = [2**-i for i in range(len(rockets))]
+    pad_weights = [2**-i for i in range(len(launchpads))]
+    # spread evenly over 20 years, several launches may share a second
+    step = max(1, (20 * 365 * 24 * 3600) // max(n, 1))
+    launches = []
+
+    for i in range(n):
+        date_unix = START_UNIX + i * step + rng.randrange(step)
+        outcome = rng.random()
+        success = None if outcome < 0.05 else outcome > 0.12
+        slug = f"launch-{i}"
+        launches.append(
+            {
+                "id": _id("", i),
+                "name": f"Synthetic {i}",
+                "date_utc": _iso(date_unix),
+                "date_unix": date_unix,
+                "rocket": rng.choices(rockets, rocket_weights)[0]["id"],
+                "launchpad": rng.choices(launchpads, pad_weights)[0]["id"],
+                "success": success,
+                "upcoming": success is None,
+                "details": (
+                    None if rng.random() < 0.4 else f"Mission {i} " * rng.randint(1, 8)
+                ),
+                "links": {
+                    "patch": {
+                        "small": f"https://img.example/{slug}_s.png",
+                        "large": f"https://img.example/{slug}_l.png",
+                    },
+                    "reddit": {"campaign": None, "launch": None},
+                    "flickr": {"small": [], "original": []},
+                    "webcast": f"https://video.example/{slug}",
+                    "wikipedia": None,
+                },
+                "failures": (
+                    [
+                        {
+                            "time": rng.randint(-10, 600),
+                            "altitude": rng.choice([None, rng.randint(0, 200)]),
+                            "reason": rng.choice(FAILURE_REASONS),
+                        }
+                    ]
+                    if success is False
+                    else []
+                ),
+            }
+        )
+    return launches
+
+
+def _iso(date_unix: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(date_unix))
+
+
+def generate_dataset(n: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    """raw upstream payloads with `n` launches"""
+    rockets = generate_rockets()
+    launchpads = generate_launchpads()
+    return {
+        "launches": generate_launches(n, rockets, launchpads, seed),
+        "rockets": rockets,
+        "launchpads": launchpads,
+    }
@@ -18,3 +18,14 @@ def event_loop():
         loop = asyncio.new_event_loop()
     yield loop
     loop.close()
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit(monkeypatch):
+    """every test starts against an upstream with a closed circuit breaker"""
+    from app.libs import BREAKER
+    from app.resilience import CircuitBreaker
+
+    monkeypatch.setattr(
+        "app.libs.BREAKER", CircuitBreaker(BREAKER.threshold, BREAKER.cooldown)
+    )
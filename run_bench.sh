@@ -0,0 +1,5 @@
+set -a  # Auto-export all variables
+    source .env.testing
+    set +a
+# e.g. ./run_bench.sh --scales 1,10,100 --save bench.json
+python -m benchmarks.bench "$@" | tee bench_output.txt
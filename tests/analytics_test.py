@@ -1,5 +1,11 @@
+import asyncio
+import json
 from datetime import datetime
 
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
 from app.analytics import launch_frequency, launches_by_site, rocket_success_rate
 from app.models import Launch, Rocket
 
@@ -105,3 +111,86 @@ def test_rocket_success_rate_none_success():
     result = rocket_success_rate(launches, rockets)
     assert len(result["values"]) == 1
     assert result["values"][0] == 0  # None treated as failure
+
+
+def test_analytics_json_computed_once_per_generation(monkeypatch):
+    from app import analytics as analytics_module
+    from app.libs import build_cache
+
+    data = build_cache(launches, rockets, [], 0, 1)
+    calls = []
+    compute = analytics_module.compute_analytics
+
+    def counting_compute(d):
+        calls.append(d["generation"])
+        return compute(d)
+
+    monkeypatch.setattr(analytics_module, "compute_analytics", counting_compute)
+
+    body = analytics_module.analytics_json(data)
+    assert analytics_module.analytics_json(data) is body
+    assert calls == [1]
+
+    result = json.loads(body)
+    assert result["successByRocket"]["labels"] == ["rocket1_name", "rocket2_name"]
+    assert result["launchesBySite"] == {"labels": ["A", "B"], "values": [2, 1]}
+    assert result["frequencyByYear"]["labels"] == [2020, 2021]
+
+    # next generation recomputes
+    analytics_module.analytics_json(build_cache(launches, rockets, [], 0, 2))
+    assert calls == [1, 2]
+
+
+def test_aggregate_matches_per_row_functions():
+    from app.analytics import aggregate
+    from app.store import LaunchStore
+
+    result = aggregate(LaunchStore(launches), rockets)
+
+    assert result["successByRocket"] == rocket_success_rate(launches, rockets)
+    assert result["launchesBySite"] == launches_by_site(launches)
+    assert result["frequencyByYear"] == launch_frequency(launches)
+
+
+def test_aggregate_filtered_subset():
+    from app.analytics import aggregate
+    from app.store import LaunchStore
+
+    store = LaunchStore(launches)
+    result = aggregate(store, rockets, store.positions(rocket="rocket2"))
+
+    assert result["successByRocket"] == {"labels": ["rocket2_name"], "values": [0.5]}
+    assert result["launchesBySite"] == {"labels": ["A", "B"], "values": [1, 1]}
+    assert result["frequencyByYear"]["labels"] == [2020, 2021]
+
+    empty = aggregate(store, rockets, store.positions(rocket="none"))
+    assert empty["successByRocket"] == {"labels": [], "values": []}
+    assert empty["frequencyByYear"] == {"labels": [], "values": []}
+
+
+@pytest.mark.asyncio
+async def test_stats_endpoint_accepts_filters(monkeypatch):
+    from app.routers import _stats_router
+
+    async def fake_load_all_data():
+        return {
+            "launches": [t.model_dump() for t in launches],
+            "rockets": [r.model_dump() for r in rockets],
+            "launchpads": [],
+        }
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_stats_router())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        full = (await ac.get("/stats/data")).json()
+        filtered = (await ac.get("/stats/data?success=false")).json()
+
+    assert full["launchesBySite"] == {"labels": ["A", "B"], "values": [2, 1]}
+    assert filtered["successByRocket"] == {"labels": ["rocket2_name"], "values": [0]}
+    assert filtered["launchesBySite"] == {"labels": ["B"], "values": [1]}
@@ -0,0 +1,38 @@
+"""smoke tests keeping the benchmark harness runnable"""
+
+import pytest
+
+from benchmarks.bench import percentile, regressions, report, run_dataset
+from benchmarks.datasets import load_fixture, scale_fixture
+
+
+def test_scaled_fixture_has_unique_ids():
+    raw = load_fixture()
+    scaled = scale_fixture(raw, 3)
+
+    assert len(scaled["launches"]) == 3 * len(raw["launches"])
+    assert len({t["id"] for t in scaled["launches"]}) == len(scaled["launches"])
+    assert scaled["rockets"] is raw["rockets"]
+
+
+def test_percentile_and_regressions():
+    assert percentile([3, 1, 2, 4], 50) == 2
+    assert percentile([3, 1, 2, 4], 99) == 4
+
+    baseline = [{"dataset": "x1", "scenario": "filter/none", "p50_ms": 1.0}]
+    slower = [{"dataset": "x1", "scenario": "filter/none", "p50_ms": 1.5}]
+    assert regressions(slower, baseline, 0.2) == [
+        "x1 filter/none: p50 1.000 -> 1.500 ms"
+    ]
+    assert regressions(slower, baseline, 0.6) == []
+
+
+@pytest.mark.asyncio
+async def test_run_dataset_covers_every_path():
+    results = await run_dataset(load_fixture(), "x1", 1, "gzip", cold_queries=True)
+
+    scenarios = {r["scenario"] for r in results}
+    assert {"fill/cold", "fill/warm", "stats/all", "export/csv"} <= scenarios
+    assert any(name.startswith("filter/") for name in scenarios)
+    assert all(r["p50_ms"] > 0 and r["peak_kib"] > 0 for r in results)
+    assert "filter/none" in report(results)
@@ -0,0 +1,79 @@
+"""tests for the compact resident launch representation"""
+
+import tracemalloc
+
+from app.compact import LaunchRecord, LaunchTable
+from app.libs import validate_data
+from app.models import Launch
+
+
+def _raw(i, links=True):
+    return {
+        "id": f"{i:024x}",
+        "name": f"Launch {i}",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": i,
+        "rocket": "".join(["5e9d0d95eda6997", "3a809d1ec"]),
+        "launchpad": "5e9e4502f509094188566f88",
+        "success": i % 2 == 0,
+        "links": (
+            {
+                "patch": {"small": "https://x/s.png", "large": "https://x/l.png"},
+                "reddit": {"campaign": None, "launch": "https://r"},
+                "flickr": {"small": [], "original": []},
+                "wikipedia": f"https://w/{i}",
+            }
+            if links
+            else {}
+        ),
+        "failures": [] if i else [{"time": 33, "altitude": None, "reason": "fire"}],
+    }
+
+
+def test_records_round_trip_to_launch():
+    launches = [Launch.model_validate(_raw(i, links=i != 1)) for i in range(3)]
+    table = LaunchTable(launches)
+
+    assert len(table) == 3
+    assert list(table) == launches
+    assert table[1:] == launches[1:]
+    assert table[0].failures[0].reason == "fire"
+    assert table[2].model_dump_json() == launches[2].model_dump_json()
+    assert table.records[1]._links is None
+    assert table.records[0].links == launches[0].links
+
+
+def test_foreign_keys_are_interned():
+    table = LaunchTable([Launch.model_validate(_raw(i)) for i in range(2)])
+
+    assert table.records[0].rocket is table.records[1].rocket
+    assert table.records[0].launchpad is table.records[1].launchpad
+
+
+def test_cache_keeps_records_and_hands_out_models():
+    cache = validate_data(
+        {"launches": [_raw(0), _raw(1)], "rockets": [], "launchpads": []}
+    )
+
+    assert isinstance(cache["launches"].records[0], LaunchRecord)
+    assert isinstance(cache["launches"][0], Launch)
+    assert [t.id for t in cache["store"].select(success="true")] == [_raw(0)["id"]]
+
+
+def test_records_are_smaller_than_models():
+    launches = [Launch.model_validate(_raw(i)) for i in range(500)]
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        table = LaunchTable(launches)
+        records = tracemalloc.get_traced_memory()[0] - before
+
+        before = tracemalloc.get_traced_memory()[0]
+        copies = [Launch.model_validate(_raw(i)) for i in range(500)]
+        models = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert len(table) == len(copies)
+    assert records < models / 2
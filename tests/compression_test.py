@@ -0,0 +1,158 @@
+"""tests for response compression"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.compression import ENCODERS, compress_stream, negotiate
+from app.routers import _export_router, _filter_launches_router
+
+fake_launches_raw = [
+    {
+        "id": str(i),
+        "name": f"Launch {i}",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": i,
+        "rocket": "r1",
+        "launchpad": "p1",
+        "success": True,
+        "details": "a fairly repetitive description " * 4,
+        "links": {"wikipedia": f"https://en.wikipedia.org/wiki/Launch_{i}"},
+    }
+    for i in range(50)
+]
+
+
+@pytest.fixture
+def setup_app(monkeypatch):
+    async def fake_load_all_data():
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_export_router())
+    return app
+
+
+def test_negotiate():
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("GZIP;q=0.5") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("*") is not None
+    assert negotiate("*, gzip;q=0") in (None, "br", "zstd")
+
+
+def test_compress_stream_roundtrip():
+    chunks = ["first,", b"second,", "third"]
+    compressed = list(compress_stream(chunks, "gzip"))
+
+    assert len(compressed) == 4
+    assert gzip.decompress(b"".join(compressed)) == b"first,second,third"
+    assert compress_stream(chunks, None) is chunks
+
+
+def _decompress(encoding, data):
+    if encoding == "br":
+        return pytest.importorskip("brotli").decompress(data)
+    # streamed frames carry no content size, decompressobj copes with that
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+@pytest.mark.parametrize("encoding, module", [("br", "brotli"), ("zstd", "zstandard")])
+def test_optional_encoders_roundtrip(encoding, module):
+    pytest.importorskip(module)
+    chunks = ["first,", b"second,", "third"]
+    body = b"a fairly repetitive description " * 64
+
+    compressed = list(compress_stream(chunks, encoding))
+    assert len(compressed) == 4
+    assert _decompress(encoding, b"".join(compressed)) == b"first,second,third"
+    assert _decompress(encoding, ENCODERS[encoding].compress(body)) == body
+    assert negotiate(f"gzip;q=0.5, {encoding}") == encoding
+
+
+@pytest.mark.asyncio
+async def test_launches_gzip_is_precompressed_once(setup_app):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers = {"Accept-Encoding": "gzip"}
+        first = await ac.get("/launches/filter", headers=headers)
+        second = await ac.get("/launches/filter", headers=headers)
+        plain = await ac.get("/launches/filter", headers={"Accept-Encoding": ""})
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert len(first.json()) == 50
+    assert "content-encoding" not in plain.headers
+    assert first.headers["etag"] != plain.headers["etag"]
+
+    memo = setup_app.state.cache["memo"]
+    assert gzip.decompress(memo["launches.gzip"]) == plain.content
+    assert second.content == first.content
+
+
+@pytest.mark.asyncio
+async def test_small_bodies_are_not_compressed(setup_app):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(
+            "/launches/filter?rocket=none", headers={"Accept-Encoding": "gzip"}
+        )
+
+    assert response.json() == []
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", ["/export/json?format=ndjson", "/export/csv"])
+async def test_exports_stream_compressed(setup_app, url):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        async with ac.stream("GET", url, headers={"Accept-Encoding": "gzip"}) as r:
+            raw = b"".join([chunk async for chunk in r.aiter_raw()])
+            encoding = r.headers["content-encoding"]
+
+    assert encoding == "gzip"
+    lines = gzip.decompress(raw).decode().splitlines()
+    if url.endswith("ndjson"):
+        assert [json.loads(line)["id"] for line in lines][-1] == "49"
+    else:
+        assert len(lines) == 51
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding, module", [("br", "brotli"), ("zstd", "zstandard")])
+async def test_optional_encodings_on_endpoints(setup_app, encoding, module):
+    pytest.importorskip(module)
+    headers = {"Accept-Encoding": encoding}
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        plain = await ac.get("/launches/filter", headers={"Accept-Encoding": ""})
+        responses = {}
+        for url in ("/launches/filter", "/export/json?format=ndjson"):
+            async with ac.stream("GET", url, headers=headers) as r:
+                raw = b"".join([chunk async for chunk in r.aiter_raw()])
+                responses[url] = r.headers["content-encoding"], raw
+
+    encoded, body = responses["/launches/filter"]
+    assert encoded == encoding
+    assert _decompress(encoding, body) == plain.content
+    memo = setup_app.state.cache["memo"]
+    assert memo[f"launches.{encoding}"] == body
+
+    encoded, body = responses["/export/json?format=ndjson"]
+    assert encoded == encoding
+    lines = _decompress(encoding, body).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines][-1] == "49"
@@ -0,0 +1,111 @@
+"""tests for ETag / Last-Modified conditional GET"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.routers import _export_router, _filter_launches_router, _stats_router
+
+fake_launches_raw = [
+    {
+        "id": "1",
+        "name": "A",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": 0,
+        "rocket": "r1",
+        "launchpad": "p1",
+        "success": True,
+        "details": None,
+        "links": {},
+    },
+    {
+        "id": "2",
+        "name": "B",
+        "date_utc": "2021-01-01T00:00:00Z",
+        "date_unix": 4,
+        "rocket": "r2",
+        "launchpad": "p2",
+        "success": False,
+        "details": None,
+        "links": {},
+    },
+]
+
+
+@pytest.fixture
+def setup_app(monkeypatch):
+    async def fake_load_all_data():
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_stats_router())
+    app.include_router(_export_router())
+    return app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url", ["/launches/filter?success=true", "/stats/data", "/export/csv"]
+)
+async def test_matching_etag_gets_304(setup_app, url):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get(url)
+        etag = first.headers["etag"]
+        second = await ac.get(url, headers={"If-None-Match": etag})
+        weak = await ac.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+
+    assert first.status_code == 200
+    assert etag.startswith('"') and etag.endswith('"')
+    assert "last-modified" in first.headers
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert second.headers["vary"] == first.headers["vary"] == "Accept-Encoding"
+    assert weak.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_etag_depends_on_query_and_dataset(setup_app):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        all_launches = await ac.get("/launches/filter")
+        filtered = await ac.get("/launches/filter?rocket=r1")
+        stale = all_launches.headers["etag"]
+
+        # a refresh installs a new generation, old validators stop matching
+        setup_app.state.cache_expires = 0
+        refreshed = await ac.get("/launches/filter", headers={"If-None-Match": stale})
+
+    assert filtered.headers["etag"] != stale
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != stale
+
+
+@pytest.mark.asyncio
+async def test_if_modified_since(setup_app):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get("/stats/data")
+        modified = first.headers["last-modified"]
+        same = await ac.get("/stats/data", headers={"If-Modified-Since": modified})
+        old = await ac.get(
+            "/stats/data",
+            headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"},
+        )
+        future = await ac.get(
+            "/stats/data",
+            headers={"If-Modified-Since": "Sun, 06 Nov 2094 08:49:37 -0000"},
+        )
+
+    assert same.status_code == 304
+    assert old.status_code == 200
+    assert future.status_code == 304
@@ -0,0 +1,103 @@
+"""tests for the incremental (delta) cache refresh"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+import respx
+from fastapi import FastAPI
+
+from app.libs import merge_launches, refresh_cache
+from app.models import Launch
+
+
+def _raw(id, date_unix, success=None, upcoming=False):
+    return {
+        "id": id,
+        "name": f"Launch {id}",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": date_unix,
+        "rocket": "r1",
+        "launchpad": "p1",
+        "success": success,
+        "upcoming": upcoming,
+        "links": {},
+    }
+
+
+history = [_raw("1", 10, True), _raw("2", 20, False), _raw("3", 30, upcoming=True)]
+
+
+def _app():
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    return app
+
+
+def test_merge_replaces_changed_and_appends_new():
+    launches = [Launch.model_validate(item) for item in history]
+    fingerprints = {}
+
+    merged = merge_launches(
+        launches, fingerprints, [_raw("3", 30, success=True), _raw("4", 40)]
+    )
+
+    assert [t.id for t in merged] == ["1", "2", "3", "4"]
+    assert merged[0] is launches[0]
+    assert merged[2].success is True
+    assert set(fingerprints) == {"3", "4"}
+
+
+def test_merge_skips_unchanged_records(monkeypatch):
+    launches = [Launch.model_validate(item) for item in history]
+    fingerprints = {}
+    merged = merge_launches(launches, fingerprints, [_raw("3", 30, upcoming=True)])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged record revalidated")
+
+    monkeypatch.setattr(Launch, "model_validate", fail)
+    again = merge_launches(merged, fingerprints, [_raw("3", 30, upcoming=True)])
+
+    assert again[2] is merged[2]
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_uses_query_endpoint(monkeypatch):
+    monkeypatch.setattr("app.libs.REFRESH_MODE", "incremental")
+    app = _app()
+
+    with respx.mock:
+        full = respx.get("https://api.spacexdata.com/v4/launches").mock(
+            return_value=httpx.Response(200, json=history)
+        )
+        query = respx.post("https://api.spacexdata.com/v4/launches/query").mock(
+            return_value=httpx.Response(
+                200, json={"docs": [_raw("3", 30, success=True)], "totalDocs": 1}
+            )
+        )
+        respx.get("https://api.spacexdata.com/v4/rockets").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+        respx.get("https://api.spacexdata.com/v4/launchpads").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+
+        first = await refresh_cache(app)
+        second = await refresh_cache(app)
+
+    assert full.call_count == 1
+    assert query.call_count == 1
+    body = json.loads(query.calls[0].request.content)
+    assert body["options"] == {"pagination": False}
+    assert {"upcoming": True} in body["query"]["$or"]
+
+    assert second["generation"] == first["generation"] + 1
+    assert [t.id for t in second["launches"]] == ["1", "2", "3"]
+    # unchanged launches keep their resident record across generations
+    assert second["launches"].records[0] is first["launches"].records[0]
+    assert second["launches"][2].success is True
+    assert [t.id for t in second["store"].select(success="true")] == ["1", "3"]
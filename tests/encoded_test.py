@@ -0,0 +1,99 @@
+"""tests for the per-generation pre-encoded response bodies"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.encoded import launches_body, rockets_body
+from app.libs import validate_data
+from app.routers import (
+    _filter_launches_router,
+    _select_launchpad_router,
+    _select_rocket_router,
+)
+
+fake_raw = {
+    "launches": [
+        {
+            "id": "1",
+            "name": "A",
+            "date_utc": "2020-01-01T00:00:00Z",
+            "date_unix": 0,
+            "rocket": "r1",
+            "launchpad": "p1",
+            "success": True,
+            "details": None,
+            "links": {"article": "https://example.com"},
+        },
+        {
+            "id": "2",
+            "name": "B",
+            "date_utc": "2021-01-01T00:00:00Z",
+            "date_unix": 4,
+            "rocket": "r2",
+            "launchpad": "p1",
+            "success": False,
+            "details": "boom",
+            "links": {},
+            "failures": [{"time": 10, "altitude": 2, "reason": "engine"}],
+        },
+    ],
+    "rockets": [{"id": "r1", "name": "Falcon 1"}, {"id": "r2", "name": "Falcon 9"}],
+    "launchpads": [
+        {
+            "id": "p1",
+            "name": "SLC 40",
+            "full_name": "Space Launch Complex 40",
+            "locality": "Cape Canaveral",
+            "region": "Florida",
+            "latitude": 28.56,
+            "longitude": -80.57,
+            "launches": ["1", "2"],
+        }
+    ],
+}
+
+
+def test_bodies_match_model_dump_and_are_reused():
+    cache = validate_data(fake_raw)
+
+    body = launches_body(cache)
+    assert json.loads(body) == [t.model_dump() for t in cache["launches"]]
+    assert launches_body(cache) is body
+
+    assert json.loads(launches_body(cache, [1])) == [cache["launches"][1].model_dump()]
+    assert json.loads(launches_body(cache, [])) == []
+
+    assert json.loads(rockets_body(cache)) == [r.model_dump() for r in cache["rockets"]]
+    assert rockets_body(cache) is rockets_body(cache)
+
+
+@pytest.mark.asyncio
+async def test_select_and_filter_endpoints_serve_encoded_bodies(monkeypatch):
+    async def fake_load_all_data():
+        return fake_raw
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_select_rocket_router())
+    app.include_router(_select_launchpad_router())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        launches = await ac.get("/launches/filter")
+        filtered = await ac.get("/launches/filter?success=false")
+        rockets = await ac.get("/select/rocket")
+        launchpads = await ac.get("/select/launchpad")
+
+    assert launches.headers["content-type"] == "application/json"
+    assert [t["id"] for t in launches.json()] == ["1", "2"]
+    assert filtered.json()[0]["failures"][0]["reason"] == "engine"
+    assert [r["name"] for r in rockets.json()] == ["Falcon 1", "Falcon 9"]
+    assert launchpads.json()[0]["region"] == "Florida"
@@ -5,7 +5,7 @@ import pytest
 import respx
 from fastapi import FastAPI, Request
 
-from app.libs import get_data, load_cached_data
+from app.libs import get_data, load_all_data, load_cached_data
 
 
 @pytest.mark.asyncio
@@ -48,3 +48,21 @@ async def test_cache_with_invalid_data(monkeypatch):
 
     with pytest.raises(Exception):  # Should handle validation errors
         await load_cached_data(request)
+
+
+@pytest.mark.asyncio
+async def test_load_all_data_none_when_endpoint_fails():
+    """A single failing endpoint makes the whole fetch fall back to cache."""
+    with respx.mock:
+        respx.get("https://api.spacexdata.com/v4/launches").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+        respx.get("https://api.spacexdata.com/v4/rockets").mock(
+            return_value=httpx.Response(500)
+        )
+        respx.get("https://api.spacexdata.com/v4/launchpads").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+        result = await load_all_data()
+
+    assert result is None
@@ -9,6 +9,8 @@ import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 
+from app.export import iter_csv, iter_json
+from app.models import Launch
 from app.routers import _export_router
 
 fake_launches_raw = [
@@ -253,3 +255,82 @@ async def test_export_json_structure(setup_app):
     assert isinstance(first_launch["launchpad"], str)
     assert isinstance(first_launch["success"], bool)
     assert isinstance(first_launch["links"], dict)
+
+
+def test_iter_csv_yields_chunks_of_rows():
+    """CSV is produced incrementally, chunk_size rows at a time."""
+    launches = [Launch.model_validate(item) for item in fake_launches_raw]
+
+    chunks = list(iter_csv(launches, chunk_size=2))
+
+    assert len(chunks) == 2
+    assert chunks[0].startswith("id,name,")
+    assert chunks[0].count("\n") == 3  # header + 2 rows
+    assert chunks[1].count("\n") == 1
+
+    rows = list(csv.DictReader(StringIO("".join(chunks))))
+    assert [row["id"] for row in rows] == ["1", "2", "3"]
+
+
+def test_iter_csv_is_lazy():
+    """Rows are pulled from the source only as chunks are consumed."""
+    pulled = []
+
+    def source():
+        for item in fake_launches_raw:
+            pulled.append(item["id"])
+            yield Launch.model_validate(item)
+
+    chunks = iter_csv(source(), chunk_size=1)
+    next(chunks)
+
+    assert pulled == ["1"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 500])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_array_is_valid_for_any_chunking(chunk_size, indent):
+    launches = [Launch.model_validate(item) for item in fake_launches_raw]
+
+    body = b"".join(iter_json(launches, "json", indent, chunk_size=chunk_size))
+
+    assert [t["id"] for t in json.loads(body)] == ["1", "2", "3"]
+
+
+def test_iter_json_uses_pre_encoded_rows():
+    launches = [Launch.model_validate(item) for item in fake_launches_raw]
+    encoded = [b'{"id":"a"}', b'{"id":"b"}', b'{"id":"c"}']
+
+    body = b"".join(iter_json(launches, "ndjson", None, encoded, chunk_size=2))
+
+    assert body == b'{"id":"a"}\n{"id":"b"}\n{"id":"c"}\n'
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(setup_app):
+    """Test NDJSON export, one compact record per line."""
+
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/export/json?format=ndjson&success=true")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "launches.ndjson" in response.headers["content-disposition"]
+
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["1", "3"]
+
+
+@pytest.mark.asyncio
+async def test_export_json_without_indent(setup_app):
+    """indent=0 streams the compact pre-encoded rows."""
+
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        compact = await ac.get("/export/json?indent=0")
+        indented = await ac.get("/export/json")
+
+    assert "\n" not in compact.text
+    assert compact.json() == indented.json()
+    assert len(compact.content) < len(indented.content)
@@ -0,0 +1,106 @@
+"""tests for the rocket/launchpad join index"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.analytics import aggregate
+from app.libs import validate_data
+from app.routers import _filter_launches_router, _stats_router
+
+
+def _launch(id, rocket, launchpad):
+    return {
+        "id": id,
+        "name": f"Launch {id}",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": int(id),
+        "rocket": rocket,
+        "launchpad": launchpad,
+        "success": True,
+        "links": {},
+    }
+
+
+def _pad(id, name, region):
+    return {
+        "id": id,
+        "name": name,
+        "full_name": name,
+        "locality": "somewhere",
+        "region": region,
+        "latitude": 0,
+        "longitude": 0,
+    }
+
+
+fake_raw = {
+    "launches": [
+        _launch("1", "r1", "p1"),
+        _launch("2", "r2", "p2"),
+        _launch("3", "r1", "p2"),
+        _launch("4", "r3", "p3"),
+    ],
+    "rockets": [{"id": "r1", "name": "Falcon 9"}, {"id": "r2", "name": "Falcon Heavy"}],
+    "launchpads": [_pad("p1", "SLC 40", "Florida"), _pad("p2", "LC 39A", "Florida")],
+}
+
+
+def test_store_joins_names_and_filters():
+    store = validate_data(fake_raw)["store"]
+
+    assert store.rockets_by_id["r2"].name == "Falcon Heavy"
+    assert store.launchpads_by_id["p1"].region == "Florida"
+    assert store.positions(rocket_name="falcon 9") == [0, 2]
+    assert store.positions(region="FLORIDA", rocket="r2") == [1]
+    assert store.positions(region="Texas") == []
+
+
+def test_stats_resolve_launchpad_names():
+    store = validate_data(fake_raw)["store"]
+
+    result = aggregate(store)
+
+    assert result["successByRocket"]["labels"] == ["Falcon 9", "Falcon Heavy", "r3"]
+    assert result["launchesBySite"]["labels"] == ["p1", "p2", "p3"]
+    assert result["launchpadNames"] == {"p1": "SLC 40", "p2": "LC 39A"}
+
+
+@pytest.mark.asyncio
+async def test_embedded_names_and_joined_filters(monkeypatch):
+    async def fake_load_all_data():
+        return fake_raw
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_stats_router())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        embedded = await ac.get("/launches/filter?embed=true")
+        projected = await ac.get("/launches/filter?embed=true&fields=id&limit=1")
+        plain = await ac.get("/launches/filter?rocket_name=Falcon%20Heavy")
+        stats = await ac.get("/stats/data?region=florida")
+
+    rows = embedded.json()
+    assert rows[1]["rocket_name"] == "Falcon Heavy"
+    assert rows[0]["launchpad_region"] == "Florida"
+    assert rows[3]["rocket_name"] is None and rows[3]["launchpad_name"] is None
+    assert projected.json() == [
+        {
+            "id": "1",
+            "rocket_name": "Falcon 9",
+            "launchpad_name": "SLC 40",
+            "launchpad_region": "Florida",
+        }
+    ]
+    assert [t["id"] for t in plain.json()] == ["2"]
+    assert "rocket_name" not in plain.json()[0]
+    assert json.loads(stats.content)["launchesBySite"]["values"] == [1, 2]
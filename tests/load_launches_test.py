@@ -8,8 +8,9 @@ import pytest
 import respx
 from fastapi import FastAPI, Request
 
-from app.libs import load_cached_data
+from app.libs import load_all_data, load_cached_data
 from app.models import Launch
+from app.sources import start_http_client, stop_http_client
 
 
 @pytest.mark.asyncio
@@ -97,3 +98,26 @@ async def test_load_cached_data_cache_hit():
 
     assert len(launches) == 1
     assert launches[0].id == "cached"
+
+
+@pytest.mark.asyncio
+async def test_load_all_data_shares_pooled_client():
+    client = await start_http_client()
+    try:
+        with respx.mock:
+            routes = [
+                respx.get(f"https://api.spacexdata.com/v4/{name}").mock(
+                    return_value=httpx.Response(200, json=[])
+                )
+                for name in ("launches", "rockets", "launchpads")
+            ]
+            raw = await load_all_data()
+            assert await start_http_client() is client
+    finally:
+        await stop_http_client()
+
+    assert {name: part[:2] for name, part in raw.items()} == {
+        name: ([], []) for name in ("launches", "rockets", "launchpads")
+    }
+    assert all(route.call_count == 1 for route in routes)
+    assert client.is_closed
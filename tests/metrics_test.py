@@ -0,0 +1,143 @@
+"""tests for the Prometheus metrics endpoint"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app import libs
+from app.libs import get_data, refresh_cache
+from app.metrics import Counter, Histogram, MetricsMiddleware, render_metrics
+from app.routers import _filter_launches_router, _metrics_router
+from app.sources import LocalSource
+from app.validation import RecordStream
+from benchmarks.datasets import MOCK_DIR
+
+fake_launches_raw = [
+    {
+        "id": "1",
+        "name": "A",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": 0,
+        "rocket": "r1",
+        "launchpad": "p1",
+        "success": True,
+        "links": {},
+    }
+]
+
+
+def _sample(text: str, prefix: str) -> float:
+    """value of the first sample line starting with `prefix`"""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h", "help", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, "/x")
+
+    lines = histogram.render()
+
+    assert 'h_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'h_bucket{route="/x",le="1"} 3' in lines
+    assert 'h_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'h_count{route="/x"} 4' in lines
+    assert "# TYPE h histogram" in lines
+
+
+def test_counter_escapes_labels():
+    counter = Counter("c", "help", ("kind",))
+    counter.inc('say "hi"')
+    counter.inc('say "hi"', amount=2)
+
+    assert counter.render()[-1] == 'c{kind="say \\"hi\\""} 3'
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_are_counted():
+    before = render_metrics()
+    with respx.mock:
+        respx.get("https://api.spacexdata.com/v4/rockets").mock(
+            return_value=httpx.Response(502)
+        )
+        assert await get_data("rockets") is None
+    after = render_metrics()
+
+    prefix = 'upstream_fetch_errors_total{endpoint="rockets",kind="http"}'
+    assert _sample(after, prefix) == _sample(before, prefix) + 1
+    count = 'upstream_fetch_duration_seconds_count{endpoint="rockets"}'
+    assert _sample(after, count) == _sample(before, count) + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(monkeypatch):
+    async def fake_load_all_data():
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_metrics_router())
+    app.add_middleware(MetricsMiddleware)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        before = (await ac.get("/metrics")).text
+        await ac.get("/launches/filter")
+        await ac.get("/launches/filter?rocket=r1")
+        response = await ac.get("/metrics")
+
+    text = response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    latency = (
+        'http_request_duration_seconds_count{route="/launches/filter",'
+        'method="GET",status="200"}'
+    )
+    assert _sample(text, latency) == _sample(before, latency) + 2
+    hits = 'cache_requests_total{result="hit"}'
+    misses = 'cache_requests_total{result="miss"}'
+    assert _sample(text, hits) == _sample(before, hits) + 1
+    assert _sample(text, misses) == _sample(before, misses) + 1
+    assert 'dataset_records{collection="launches"} 1' in text
+    assert "cache_age_seconds " in text
+    assert 'validation_duration_seconds_count{mode="full"}' in text
+
+
+@pytest.mark.asyncio
+async def test_streamed_validation_is_not_fetch_time(monkeypatch):
+    feed = RecordStream.feed
+
+    def slow_feed(self, chunk):
+        time.sleep(0.05)
+        feed(self, chunk)
+
+    monkeypatch.setattr(RecordStream, "feed", slow_feed)
+    monkeypatch.setattr(libs, "SOURCE", LocalSource(str(MOCK_DIR)))
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    before = render_metrics()
+
+    launches = await get_data("launches")
+    fetched = render_metrics()
+    await refresh_cache(app)
+    after = render_metrics()
+
+    # a slow feed per chunk: one or more per collection
+    assert launches.seconds >= 0.05
+    fetch = 'upstream_fetch_duration_seconds_sum{endpoint="launches"}'
+    assert _sample(fetched, fetch) - _sample(before, fetch) < 0.05
+    validation = 'validation_duration_seconds_sum{mode="full"}'
+    assert _sample(after, validation) - _sample(before, validation) >= 0.15
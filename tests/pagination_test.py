@@ -0,0 +1,169 @@
+"""tests for cursor pagination and field projection"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.encoded import LAUNCH_JSON, launches_body
+from app.libs import validate_data
+from app.query_cache import QUERY_CACHE_STATS
+from app.routers import _export_router, _filter_launches_router
+from benchmarks.datasets import MOCK_DIR
+
+# two launches share every date, so ties are broken by id
+fake_launches_raw = [
+    {
+        "id": f"l{i}",
+        "name": f"Launch {i}",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": (9 - i) // 2,
+        "rocket": "r1" if i % 2 else "r2",
+        "launchpad": "p1",
+        "success": True,
+        "links": {},
+    }
+    for i in range(10)
+]
+
+
+@pytest.fixture
+def setup_app(monkeypatch):
+    async def fake_load_all_data():
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_export_router())
+    return app
+
+
+def test_store_page_walks_keyset_order():
+    store = validate_data(
+        {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+    )["store"]
+    expected = sorted(
+        range(len(fake_launches_raw)),
+        key=lambda i: (store.launches[i].date_unix, store.launches[i].id),
+    )
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.page(None, 3, cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert store.page([0, 2, 4], 5) == ([4, 2, 0], None)
+
+
+@pytest.mark.asyncio
+async def test_filter_pages_follow_cursor(setup_app):
+    transport = ASGITransport(app=setup_app)
+    ids, url = [], "/launches/filter?rocket=r1&limit=2"
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        while True:
+            response = await ac.get(url)
+            assert response.status_code == 200
+            ids.extend(launch["id"] for launch in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+            url = f"/launches/filter?rocket=r1&limit=2&after={cursor}"
+
+    assert ids == ["l9", "l7", "l5", "l3", "l1"]
+
+
+@pytest.mark.asyncio
+async def test_field_projection(setup_app):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        launches = await ac.get("/launches/filter?fields=id,date_unix&limit=1")
+        csv = await ac.get("/export/csv?fields=name,id&limit=2")
+        ndjson = await ac.get("/export/json?format=ndjson&fields=id&rocket=r2")
+
+    assert launches.json() == [{"id": "l8", "date_unix": 0}]
+    assert launches.headers["x-next-cursor"] == "0:l8"
+    assert csv.text.splitlines() == ["id,name", "l8,Launch 8", "l9,Launch 9"]
+    assert [json.loads(line) for line in ndjson.text.splitlines()][0] == {"id": "l0"}
+
+
+@pytest.mark.asyncio
+async def test_exports_page_with_cursor(setup_app):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        rows, url = [], "/export/csv?fields=id&limit=4"
+        while url:
+            page = await ac.get(url)
+            rows += page.text.splitlines()[1:]
+            cursor = page.headers.get("x-next-cursor")
+            url = cursor and f"/export/csv?fields=id&limit=4&after={cursor}"
+        ndjson = await ac.get("/export/json?format=ndjson&limit=3")
+        everything = await ac.get("/export/csv")
+
+    assert rows == ["l8", "l9", "l6", "l7", "l4", "l5", "l2", "l3", "l0", "l1"]
+    assert ndjson.headers["x-next-cursor"] == "1:l6"
+    assert "x-next-cursor" not in everything.headers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fields", ["links", "id,links", "failures"])
+async def test_csv_rejects_nested_fields(setup_app, fields):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        csv = await ac.get(f"/export/csv?fields={fields}")
+        ndjson = await ac.get(f"/export/json?format=ndjson&fields={fields}")
+
+    assert csv.status_code == 422
+    assert ndjson.status_code == 200
+
+
+def test_projected_rows_match_the_model_dump():
+    raw = {
+        name: (MOCK_DIR / f"{name}.json").read_bytes()
+        for name in ("launches", "rockets", "launchpads")
+    }
+    cache = validate_data(raw)
+    include = {"id", "links", "failures", "details", "success"}
+
+    body = launches_body(cache, include=include)
+
+    expected = [
+        json.loads(LAUNCH_JSON.dump_json(launch, include=include))
+        for launch in cache["launches"]
+    ]
+    assert json.loads(body) == expected
+    assert any(row["failures"] for row in expected)
+
+
+@pytest.mark.asyncio
+async def test_unpaged_projection_is_memoized(setup_app):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get("/launches/filter?fields=name,id&rocket=r1")
+        hits = QUERY_CACHE_STATS["hits"]
+        second = await ac.get("/launches/filter?fields=id,name&rocket=r1")
+
+    assert first.json() == second.json()
+    assert first.json()[0] == {"id": "l1", "name": "Launch 1"}
+    assert QUERY_CACHE_STATS["hits"] > hits
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query", ["limit=0", "limit=5000", "after=nope", "fields=id,secret", "fields=,"]
+)
+async def test_invalid_paging_is_rejected(setup_app, query):
+    transport = ASGITransport(app=setup_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(f"/launches/filter?{query}")
+
+    assert response.status_code == 422
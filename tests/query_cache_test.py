@@ -0,0 +1,91 @@
+"""tests for the filter query result cache"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.query_cache import QUERY_CACHE_STATS, QueryCache, query_key
+from app.routers import _cache_stats_router, _filter_launches_router
+
+fake_launches_raw = [
+    {
+        "id": str(i),
+        "name": f"Launch {i}",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": i,
+        "rocket": "r1" if i % 2 else "r2",
+        "launchpad": "p1",
+        "success": i % 3 != 0,
+        "links": {},
+    }
+    for i in range(10)
+]
+
+
+def test_query_key_normalization():
+    assert query_key() is None
+    assert query_key(success="maybe", rocket="") is None
+    # a single date bound is not applied by the filter either
+    assert query_key(date_from=5) is None
+    assert query_key(success="TRUE") == query_key(success="true")
+    assert query_key(rocket="r1") != query_key(launchpad="r1")
+
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache = QueryCache(max_entries=2, max_bytes=10)
+    cache.get_or_compute("a", lambda: b"aaaa")
+    cache.get_or_compute("b", lambda: b"bbbb")
+    cache.get_or_compute("a", lambda: b"unused")  # refresh "a"
+    cache.get_or_compute("c", lambda: b"cc")
+
+    assert list(cache.entries) == ["a", "c"]
+
+    cache.get_or_compute("d", lambda: b"ddddddddd")
+    assert list(cache.entries) == ["d"]
+    assert cache.size == 9
+
+    # too large to ever fit, returned but not stored
+    assert cache.get_or_compute("e", lambda: b"e" * 11) == b"e" * 11
+    assert "e" not in cache.entries
+
+
+def test_lru_counts_hits_and_misses():
+    before = dict(QUERY_CACHE_STATS)
+    cache = QueryCache()
+    calls = []
+
+    for _ in range(3):
+        cache.get_or_compute("k", lambda: calls.append(1) or b"v")
+
+    assert len(calls) == 1
+    assert QUERY_CACHE_STATS["hits"] - before.get("hits", 0) == 2
+    assert QUERY_CACHE_STATS["misses"] - before.get("misses", 0) == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_filter_is_served_from_cache(monkeypatch):
+    async def fake_load_all_data():
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_cache_stats_router())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get("/launches/filter?rocket=r1&success=true")
+        before = (await ac.get("/stats/cache")).json()
+        second = await ac.get("/launches/filter?success=True&rocket=r1")
+        after = (await ac.get("/stats/cache")).json()
+
+    assert first.content == second.content
+    assert [t["id"] for t in first.json()] == ["1", "5", "7"]
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+    assert after["entries"] == 2  # positions + encoded body
@@ -0,0 +1,135 @@
+"""tests for background refresh and single-flight cache fill"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+
+from app.libs import cache_refresher, load_cached_data
+
+fake_launches_raw = [
+    {
+        "id": "1",
+        "name": "A",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": 0,
+        "rocket": "r1",
+        "launchpad": "p1",
+        "success": True,
+        "details": None,
+        "links": {},
+    },
+]
+
+
+def _app():
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    return app
+
+
+@pytest.mark.asyncio
+async def test_refresher_warms_cache(monkeypatch):
+    calls = []
+
+    async def fake_load_all_data():
+        calls.append(1)
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = _app()
+
+    task = asyncio.create_task(cache_refresher(app))
+    try:
+        for _ in range(100):
+            if app.state.cache is not None:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+
+    assert len(calls) == 1
+    assert app.state.cache["launches"][0].id == "1"
+    assert app.state.cache_expires > time.time()
+
+
+@pytest.mark.asyncio
+async def test_expired_cache_served_while_refresher_runs(monkeypatch):
+    async def fake_load_all_data():
+        raise AssertionError("request path must not fetch")
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = _app()
+    app.state.cache = {"launches": []}
+    app.state.cache_expires = time.time() - 1
+    app.state.refresh_task = asyncio.create_task(asyncio.sleep(60))
+    request = Request({"type": "http", "app": app})
+
+    try:
+        cache = await load_cached_data(request)
+    finally:
+        app.state.refresh_task.cancel()
+
+    assert cache == {"launches": []}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fill(monkeypatch):
+    calls = []
+
+    async def fake_load_all_data():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = _app()
+    request = Request({"type": "http", "app": app})
+
+    results = await asyncio.gather(*(load_cached_data(request) for _ in range(10)))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_fill_error(monkeypatch):
+    calls = []
+
+    async def fake_load_all_data():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return None
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = _app()
+    request = Request({"type": "http", "app": app})
+
+    results = await asyncio.gather(
+        *(load_cached_data(request) for _ in range(5)), return_exceptions=True
+    )
+
+    assert len(calls) == 1
+    assert all(isinstance(r, HTTPException) for r in results)
+    assert all(r.status_code == 503 for r in results)
+
+
+@pytest.mark.asyncio
+async def test_fill_rechecks_cache_after_lock(monkeypatch):
+    async def fake_load_all_data():
+        raise AssertionError("cache was refreshed while waiting on the lock")
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = _app()
+    request = Request({"type": "http", "app": app})
+
+    async with app.state.cache_lock:
+        pending = asyncio.create_task(load_cached_data(request))
+        await asyncio.sleep(0)
+        app.state.cache = {"launches": []}
+        app.state.cache_expires = time.time() + 600
+
+    assert await pending == {"launches": []}
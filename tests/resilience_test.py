@@ -0,0 +1,242 @@
+"""tests for upstream retries, hedging and the circuit breaker"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+from fastapi import FastAPI
+
+from app import libs
+from app.libs import get_data, refresh_cache
+from app.metrics import UPSTREAM_ERRORS, UPSTREAM_HEDGES, UPSTREAM_RETRIES
+from app.resilience import CircuitBreaker, backoff, hedged
+from app.sources import DataSource, LocalSource
+from app.validation import RecordStream
+from benchmarks.datasets import MOCK_DIR
+
+ROCKETS_URL = "https://api.spacexdata.com/v4/rockets"
+ROCKETS = b'[{"id": "r1", "name": "Falcon 9"}]'
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(libs, "RETRY_BACKOFF", 0)
+
+
+def test_backoff_is_jittered_below_the_cap():
+    delays = [backoff(retry, 0.1, 1) for retry in range(8) for _ in range(50)]
+
+    assert all(0 <= delay <= 1 for delay in delays)
+    assert max(backoff(0, 0.1, 1) for _ in range(50)) <= 0.1
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_a_silent_attempt():
+    calls, hedges = [], []
+
+    async def attempt(answered):
+        calls.append(answered)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+            return "first"
+        return "hedge"
+
+    result = await hedged(attempt, 0.01, lambda: hedges.append(1))
+
+    assert result == "hedge"
+    assert len(calls) == 2 and hedges == [1]
+
+
+@pytest.mark.asyncio
+async def test_answered_attempt_is_not_hedged():
+    calls = []
+
+    async def attempt(answered):
+        calls.append(answered)
+        answered.set()
+        await asyncio.sleep(0.05)  # slow body, headers were quick
+        return "body"
+
+    assert await hedged(attempt, 0.01) == "body"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_success_wins_when_both_copies_finish_together():
+    release = asyncio.Event()
+    calls = []
+
+    async def attempt(answered):
+        calls.append(answered)
+        if len(calls) == 2:
+            release.set()
+        await release.wait()
+        if len(calls) == 2 and answered is calls[0]:
+            raise RuntimeError("first copy failed")
+        return "hedge"
+
+    for _ in range(20):
+        calls.clear()
+        release.clear()
+        assert await hedged(attempt, 0.001) == "hedge"
+        assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_early_failure_is_not_hedged():
+    calls = []
+
+    async def attempt(answered):
+        calls.append(answered)
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        await hedged(attempt, 1)
+    assert len(calls) == 1
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_cooldown():
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    breaker.open_until = time.monotonic()
+    assert breaker.state == "half-open" and breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+
+    breaker.open_until = time.monotonic()
+    breaker.success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(no_backoff):
+    before = UPSTREAM_RETRIES.values.get(("rockets",), 0)
+    with respx.mock:
+        route = respx.get(ROCKETS_URL).mock(
+            side_effect=[
+                httpx.Response(503),
+                httpx.ConnectError("reset"),
+                httpx.Response(200, content=ROCKETS),
+            ]
+        )
+        rockets = await get_data("rockets")
+
+    assert [r.name for r in rockets.records] == ["Falcon 9"]
+    assert route.call_count == 3
+    assert UPSTREAM_RETRIES.values[("rockets",)] == before + 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(no_backoff):
+    with respx.mock:
+        route = respx.get(ROCKETS_URL).mock(return_value=httpx.Response(404))
+        assert await get_data("rockets") is None
+
+    assert route.call_count == 1
+
+
+class SlowSource(DataSource):
+    """answers the n-th request after delays[n] seconds"""
+
+    remote = True
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+
+    async def stream(self, endpoint):
+        await asyncio.sleep(self.delays.pop(0))
+        yield ROCKETS
+
+
+@pytest.mark.asyncio
+async def test_slow_attempts_time_out_and_are_hedged(monkeypatch, no_backoff):
+    monkeypatch.setattr(libs, "HEDGE_AFTER", {"rockets": 0.01})
+    monkeypatch.setattr(libs, "FETCH_TIMEOUT", 0.05)
+    monkeypatch.setattr(libs, "SOURCE", SlowSource(10, 0))
+    hedges = UPSTREAM_HEDGES.values.get(("rockets",), 0)
+
+    assert len((await get_data("rockets")).records) == 1
+    assert UPSTREAM_HEDGES.values[("rockets",)] == hedges + 1
+
+    monkeypatch.setattr(libs, "HEDGE_AFTER", {})
+    monkeypatch.setattr(libs, "SOURCE", SlowSource(10, 10, 10))
+    timeouts = UPSTREAM_ERRORS.values.get(("rockets", "timeout"), 0)
+
+    start = time.perf_counter()
+    assert await get_data("rockets") is None
+    assert time.perf_counter() - start < 1
+    assert UPSTREAM_ERRORS.values[("rockets", "timeout")] == timeouts + 1
+
+
+class ChunkedSource(DataSource):
+    """answers right away, one rocket per chunk"""
+
+    remote = True
+
+    async def stream(self, endpoint):
+        yield b"["
+        for i in range(10):
+            yield b"," if i else b""
+            yield b'{"id": "r%d", "name": "Falcon"}' % i
+        yield b"]"
+
+
+@pytest.mark.asyncio
+async def test_slow_validation_does_not_time_out(monkeypatch):
+    feed = RecordStream.feed
+
+    def slow_feed(self, chunk):
+        time.sleep(0.01)  # CPU bound, the upstream is idle meanwhile
+        feed(self, chunk)
+
+    monkeypatch.setattr(RecordStream, "feed", slow_feed)
+    monkeypatch.setattr(libs, "FETCH_TIMEOUT", 0.05)
+    monkeypatch.setattr(libs, "HEDGE_AFTER", {})
+    monkeypatch.setattr(libs, "SOURCE", ChunkedSource())
+
+    start = time.perf_counter()
+    rockets = await get_data("rockets")
+
+    assert time.perf_counter() - start > libs.FETCH_TIMEOUT
+    assert len(rockets.records) == 10
+    assert libs.BREAKER.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_local_sources_are_not_guarded(monkeypatch):
+    monkeypatch.setattr(libs, "SOURCE", LocalSource(str(MOCK_DIR)))
+    monkeypatch.setattr(libs, "FETCH_TIMEOUTS", {"launches": 0})
+    for _ in range(libs.BREAKER.threshold):
+        libs.BREAKER.failure()
+
+    assert libs.BREAKER.state == "open"
+    assert len((await get_data("launches")).records) > 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_serves_stale_cache_without_calling_upstream(
+    no_backoff,
+):
+    app = FastAPI()
+    app.state.cache = {"generation": 1}
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+
+    with respx.mock:
+        route = respx.get(url__startswith="https://api.spacexdata.com/v4/").mock(
+            return_value=httpx.Response(502)
+        )
+        assert await refresh_cache(app) is app.state.cache
+        calls = route.call_count
+
+        assert libs.BREAKER.state == "open"
+        assert await refresh_cache(app) is app.state.cache
+        assert route.call_count == calls
+    assert app.state.cache_expires > time.time()
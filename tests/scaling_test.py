@@ -0,0 +1,150 @@
+"""scaling tests on synthetic datasets
+
+Budgets are checked for every size in SCALING_SIZES, e.g.
+
+    SCALING_SIZES=10000,100000,300000 pytest tests/scaling_test.py
+
+and the tests are skipped when it is unset. Latency budgets for paged and
+streamed responses are fixed, the fill and resident memory budgets are per
+record, so a path that degrades super-linearly fails at the larger sizes.
+"""
+
+import asyncio
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.export import iter_csv, iter_json
+from app.libs import validate_data
+from app.methods import iter_launches, launches_encoded
+from app.models import FilterQuery, Launch, Launchpad, Rocket
+from app.routers import _export_router, _filter_launches_router, _stats_router
+from benchmarks.synthetic import generate_dataset
+
+SCALING_SIZES = [int(n) for n in os.getenv("SCALING_SIZES", "").split(",") if n]
+
+# cold fill: validation, compaction and indexing
+FILL_SECONDS_PER_RECORD = 200e-6
+RESIDENT_BYTES_PER_RECORD = 2048
+# one page or one stats body, whatever the dataset size
+PAGE_SECONDS = 0.25
+STATS_SECONDS = 0.25
+# streamed exports must not hold the selection in memory
+EXPORT_PEAK_BYTES = 16 * 1024 * 1024
+
+scaling = pytest.mark.skipif(not SCALING_SIZES, reason="SCALING_SIZES not set")
+
+
+def _encoded(n):
+    return {
+        name: json.dumps(rows).encode() for name, rows in generate_dataset(n).items()
+    }
+
+
+def test_generated_records_match_the_models():
+    raw = generate_dataset(200, seed=7)
+
+    assert generate_dataset(200, seed=7) == raw
+    launches = [Launch.model_validate(item) for item in raw["launches"]]
+    assert all(Rocket.model_validate(item) for item in raw["rockets"])
+    assert all(Launchpad.model_validate(item) for item in raw["launchpads"])
+    assert [t.date_unix for t in launches] == sorted(t.date_unix for t in launches)
+    assert {t.success for t in launches} == {True, False, None}
+    assert any(t.failures for t in launches)
+    assert {t.launchpad for t in launches} <= {p["id"] for p in raw["launchpads"]}
+
+
+@scaling
+@pytest.mark.parametrize("n", SCALING_SIZES)
+def test_fill_time_and_resident_memory(n):
+    raw = _encoded(n)
+
+    start = time.perf_counter()
+    validate_data(raw)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        cache = validate_data(raw)
+        gc.collect()
+        resident = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(cache["launches"]) == n
+    assert elapsed < n * FILL_SECONDS_PER_RECORD
+    assert resident < n * RESIDENT_BYTES_PER_RECORD
+
+
+@scaling
+@pytest.mark.asyncio
+@pytest.mark.parametrize("n", SCALING_SIZES)
+async def test_pages_stats_and_exports_within_budget(monkeypatch, n):
+    raw = _encoded(n)
+
+    async def fake_load_all_data():
+        return raw
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.include_router(_filter_launches_router())
+    app.include_router(_stats_router())
+    app.include_router(_export_router())
+
+    async def timed(ac, url):
+        start = time.perf_counter()
+        response = await ac.get(url)
+        assert response.status_code == 200
+        return response, time.perf_counter() - start
+
+    def stream_peak(chunks):
+        # consumed server side, the ASGI test transport buffers whole bodies
+        tracemalloc.start()
+        try:
+            lines = sum(chunk.count(b"\n") for chunk in chunks)
+            return lines, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    rocket = json.loads(raw["rockets"])[0]["id"]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        # fill the cache and the per-generation bodies outside the budgets
+        await ac.get("/launches/filter?limit=1")
+        await ac.get("/export/json?format=ndjson&limit=1")
+        await ac.get("/stats/data")
+
+        page, elapsed = await timed(ac, "/launches/filter?limit=100")
+        assert len(page.json()) == 100 and elapsed < PAGE_SECONDS
+
+        cursor = page.headers["x-next-cursor"]
+        url = f"/launches/filter?rocket={rocket}&limit=100&after={cursor}"
+        page, elapsed = await timed(ac, url)
+        assert len(page.json()) == 100 and elapsed < PAGE_SECONDS
+
+        _, elapsed = await timed(ac, "/stats/data?success=true")
+        assert elapsed < STATS_SECONDS
+
+    cache = app.state.cache
+    everything = FilterQuery()
+    rows, peak = stream_peak(
+        chunk.encode() for chunk in iter_csv(iter_launches(cache, everything, True))
+    )
+    assert rows == n + 1 and peak < EXPORT_PEAK_BYTES
+
+    launches, encoded = launches_encoded(cache, FilterQuery(rocket=rocket))
+    rows, peak = stream_peak(iter_json(launches, "ndjson", None, encoded))
+    assert 0 < rows < n and peak < EXPORT_PEAK_BYTES
+
+    rows, peak = stream_peak(iter_json(cache["launches"], "json", 2))
+    assert rows > n and peak < EXPORT_PEAK_BYTES
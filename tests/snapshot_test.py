@@ -0,0 +1,154 @@
+"""tests for the on-disk dataset snapshot"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+
+from app.libs import build_cache, load_cached_data, restore_snapshot
+from app.models import Launch, Launchpad, Rocket
+from app.shared import follow_snapshot, release_lead, try_lead
+from app.snapshot import read_snapshot, write_snapshot
+
+fake_launches_raw = [
+    {
+        "id": "1",
+        "name": "A",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": 0,
+        "rocket": "r1",
+        "launchpad": "p1",
+        "success": False,
+        "details": None,
+        "links": {"webcast": "https://example.com"},
+        "failures": [{"time": -5, "altitude": None, "reason": "engine"}],
+    },
+]
+
+
+def _cache(fetched_at=1000.0, generation=1):
+    return build_cache(
+        [Launch.model_validate(item) for item in fake_launches_raw],
+        [Rocket(id="r1", name="Falcon 1")],
+        [
+            Launchpad(
+                id="p1",
+                name="Pad",
+                full_name="Launch Pad",
+                locality="Somewhere",
+                region="Florida",
+                latitude=1.5,
+                longitude=-2.5,
+            )
+        ],
+        fetched_at,
+        generation,
+    )
+
+
+def _app(snapshot_path):
+    app = FastAPI()
+    app.state.cache = None
+    app.state.cache_expires = 0
+    app.state.cache_lock = asyncio.Lock()
+    app.state.snapshot_path = str(snapshot_path)
+    return app
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = tmp_path / "cache.snap"
+    write_snapshot(str(path), _cache())
+
+    snapshot = read_snapshot(str(path))
+
+    assert snapshot.fetched_at == 1000.0
+    assert snapshot.generation == 1
+    assert snapshot.launches[0].failures[0].reason == "engine"
+    assert snapshot.launches[0].links == {"webcast": "https://example.com"}
+    assert snapshot.rockets[0].name == "Falcon 1"
+    assert snapshot.launchpads[0].region == "Florida"
+
+
+def test_snapshot_missing_or_corrupt(tmp_path):
+    assert read_snapshot(str(tmp_path / "missing.snap")) is None
+
+    corrupt = tmp_path / "corrupt.snap"
+    corrupt.write_bytes(b"not a snapshot at all, just some bytes")
+    assert read_snapshot(str(corrupt)) is None
+
+    truncated = tmp_path / "truncated.snap"
+    write_snapshot(str(truncated), _cache())
+    truncated.write_bytes(truncated.read_bytes()[:-10])
+    assert read_snapshot(str(truncated)) is None
+
+
+def test_restore_snapshot_keeps_fetch_time(tmp_path):
+    path = tmp_path / "cache.snap"
+    fetched_at = time.time() - 100
+    write_snapshot(str(path), _cache(fetched_at))
+    app = _app(path)
+
+    assert restore_snapshot(app) is True
+    assert app.state.cache["launches"][0].id == "1"
+    assert app.state.cache["fetched_at"] == fetched_at
+    assert app.state.cache_expires == pytest.approx(fetched_at + 600)
+
+
+@pytest.mark.asyncio
+async def test_refresh_writes_snapshot(tmp_path, monkeypatch):
+    async def fake_load_all_data():
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    path = tmp_path / "cache.snap"
+    app = _app(path)
+
+    await load_cached_data(Request({"type": "http", "app": app}))
+
+    snapshot = read_snapshot(str(path))
+    assert [t.id for t in snapshot.launches] == ["1"]
+    assert snapshot.fetched_at == app.state.cache["fetched_at"]
+
+
+def test_only_one_worker_leads(tmp_path):
+    path = tmp_path / "cache.snap"
+    leader, follower = _app(path), _app(path)
+
+    assert try_lead(leader) is True
+    assert try_lead(follower) is False
+
+    release_lead(leader)
+    assert try_lead(follower) is True
+    release_lead(follower)
+
+
+@pytest.mark.asyncio
+async def test_follower_reloads_new_generation(tmp_path):
+    path = tmp_path / "cache.snap"
+    follower = _app(path)
+
+    assert await follow_snapshot(follower) is False
+
+    write_snapshot(str(path), _cache(time.time(), generation=3))
+    assert await follow_snapshot(follower) is True
+    assert follower.state.cache["generation"] == 3
+
+    # same generation again is not reloaded
+    assert await follow_snapshot(follower) is False
+
+
+@pytest.mark.asyncio
+async def test_follower_does_not_publish(tmp_path, monkeypatch):
+    async def fake_load_all_data():
+        return {"launches": fake_launches_raw, "rockets": [], "launchpads": []}
+
+    monkeypatch.setattr("app.libs.load_all_data", fake_load_all_data)
+    path = tmp_path / "cache.snap"
+    app = _app(path)
+    app.state.snapshot_leader = False
+
+    await load_cached_data(Request({"type": "http", "app": app}))
+
+    assert app.state.cache["generation"] == 1
+    assert not path.exists()
@@ -0,0 +1,93 @@
+"""tests for the pluggable data sources"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app import libs
+from app.libs import get_data, load_all_data, validate_data
+from app.metrics import UPSTREAM_ERRORS
+from app.snapshot import write_snapshot
+from app.sources import HttpSource, LocalSource, data_source
+from app.validation import Validated
+from benchmarks.datasets import MOCK_DIR
+
+
+def test_data_source_from_spec():
+    assert isinstance(data_source("https://api.spacexdata.com/v4"), HttpSource)
+    assert data_source("file:///srv/mirror").path == "/srv/mirror"
+    assert data_source("./mirror").path == "./mirror"
+
+
+@pytest.mark.asyncio
+async def test_local_json_directory(monkeypatch):
+    monkeypatch.setattr(libs, "SOURCE", LocalSource(str(MOCK_DIR)))
+
+    raw = await load_all_data()
+
+    assert isinstance(raw["launches"], Validated)
+    cache = validate_data(raw)
+    expected = json.loads((MOCK_DIR / "launches.json").read_text())
+    assert len(cache["launches"]) == len(expected)
+
+
+@pytest.mark.asyncio
+async def test_local_ndjson_lines_become_one_array(monkeypatch, tmp_path):
+    rows = json.loads((MOCK_DIR / "rockets.json").read_text())
+    lines = [json.dumps(row) for row in rows]
+    (tmp_path / "rockets.ndjson").write_text("\n".join(lines[:1] + [""] + lines[1:]))
+    monkeypatch.setattr("app.sources.CHUNK_SIZE", 1)
+    source = LocalSource(str(tmp_path))
+
+    chunks = [chunk async for chunk in source.stream("rockets")]
+
+    assert len(chunks) == len(rows) + 1
+    assert json.loads(b"".join(chunks)) == rows
+    assert await source.fetch("rockets") == b"".join(chunks)
+
+
+@pytest.mark.asyncio
+async def test_local_snapshot_file(tmp_path):
+    raw = {
+        name: (MOCK_DIR / f"{name}.json").read_bytes()
+        for name in ("launches", "rockets", "launchpads")
+    }
+    cache = validate_data(raw)
+    path = str(tmp_path / "cache.snap")
+    write_snapshot(path, cache)
+
+    source = LocalSource(path)
+    restored = validate_data(
+        {
+            name: await source.fetch(name)
+            for name in ("launches", "rockets", "launchpads")
+        }
+    )
+
+    assert [t.id for t in restored["launches"]] == [t.id for t in cache["launches"]]
+    assert restored["store"].rocket_names == cache["store"].rocket_names
+
+
+@pytest.mark.asyncio
+async def test_missing_local_collection_fails_the_fetch(monkeypatch, tmp_path):
+    monkeypatch.setattr(libs, "SOURCE", LocalSource(str(tmp_path)))
+    before = UPSTREAM_ERRORS.values.get(("rockets", "io"), 0)
+
+    assert await get_data("rockets") is None
+    assert UPSTREAM_ERRORS.values[("rockets", "io")] == before + 1
+    assert await load_all_data() is None
+
+
+def test_local_source_disables_incremental_refresh(monkeypatch):
+    app = SimpleNamespace(state=SimpleNamespace(cache={}, last_full_refresh=0))
+    monkeypatch.setattr(libs, "REFRESH_MODE", "incremental")
+    monkeypatch.setattr(libs, "FULL_REFRESH_INTERVAL", float("inf"))
+
+    monkeypatch.setattr(libs, "SOURCE", HttpSource(libs.BASE_URL))
+    assert libs._delta_due(app)
+    monkeypatch.setattr(libs, "SOURCE", LocalSource(str(MOCK_DIR)))
+    assert not libs._delta_due(app)
+    with pytest.raises(ValueError):
+        asyncio.run(LocalSource(str(MOCK_DIR)).fetch("launches", {"upcoming": True}))
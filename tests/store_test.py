@@ -0,0 +1,56 @@
+"""tests for the columnar launch store"""
+
+from app.models import Launch
+from app.store import LaunchStore
+
+
+def _launch(id, date_unix, rocket="r1", launchpad="p1", success=True):
+    return Launch(
+        id=id,
+        name=f"Launch {id}",
+        date_utc="2020-01-01T00:00:00Z",
+        date_unix=date_unix,
+        rocket=rocket,
+        launchpad=launchpad,
+        success=success,
+    )
+
+
+launches = [
+    _launch("1", 30, rocket="r1", launchpad="p1", success=True),
+    _launch("2", 10, rocket="r2", launchpad="p1", success=False),
+    _launch("3", 20, rocket="r1", launchpad="p2", success=None),
+    _launch("4", 40, rocket="r2", launchpad="p2", success=True),
+]
+
+
+def test_store_no_filters_returns_all_in_cache_order():
+    store = LaunchStore(launches)
+    assert [t.id for t in store.select()] == ["1", "2", "3", "4"]
+
+
+def test_store_date_range_is_inclusive():
+    store = LaunchStore(launches)
+    result = store.select(date_from=10, date_to=30)
+    assert [t.id for t in result] == ["1", "2", "3"]
+
+
+def test_store_date_range_requires_both_bounds():
+    store = LaunchStore(launches)
+    assert len(store.select(date_from=35)) == 4
+
+
+def test_store_combined_filters():
+    store = LaunchStore(launches)
+    assert [t.id for t in store.select(success="true", rocket="r2")] == ["4"]
+    assert [t.id for t in store.select(success="False")] == ["2"]
+    assert [t.id for t in store.select(launchpad="p2", date_from=0, date_to=25)] == [
+        "3"
+    ]
+
+
+def test_store_unknown_values():
+    store = LaunchStore(launches)
+    assert store.select(rocket="nope") == []
+    # unrecognised success values are ignored, like before
+    assert len(store.select(success="maybe")) == 4
@@ -0,0 +1,128 @@
+"""tests for bulk and streamed validation with per-record quarantine"""
+
+import json
+
+import httpx
+import pytest
+import respx
+from pydantic import ValidationError
+
+from app.compact import LaunchRecord, compact
+from app.libs import get_data, validate_data
+from app.metrics import UPSTREAM_ERRORS
+from app.models import Launch, Rocket
+from app.validation import RecordStream, validate_records
+
+
+def _raw(id, date_unix=0):
+    return {
+        "id": id,
+        "name": f"Launch {id}",
+        "date_utc": "2020-01-01T00:00:00Z",
+        "date_unix": date_unix,
+        "rocket": "r1",
+        "launchpad": "p1",
+        "links": {"wikipedia": None},
+        "failures": [{"time": -1, "altitude": None, "reason": "engine"}],
+    }
+
+
+def test_json_bytes_and_dicts_validate_alike():
+    items = [_raw("1"), _raw("2", 5)]
+
+    from_bytes, bad = validate_records(Launch, json.dumps(items).encode())
+    from_dicts, _ = validate_records(Launch, items)
+
+    assert bad == []
+    assert from_bytes == from_dicts
+    assert from_bytes[1].failures[0].reason == "engine"
+
+
+@pytest.mark.parametrize("as_bytes", [True, False])
+def test_bad_records_are_quarantined(as_bytes):
+    items = [_raw("1"), {**_raw("2"), "date_unix": "soon"}, {"id": "3"}, _raw("4")]
+    payload = json.dumps(items).encode() if as_bytes else items
+
+    valid, bad = validate_records(Launch, payload)
+
+    assert [t.id for t in valid] == ["1", "4"]
+    assert [(q["pos"], q["id"]) for q in bad] == [(1, "2"), (2, "3")]
+    assert all(q["errors"] for q in bad)
+
+
+@pytest.mark.parametrize("payload", [b'{"docs": []}', b"not json", [{"name": "no id"}]])
+def test_unusable_payload_raises(payload):
+    with pytest.raises(ValidationError):
+        validate_records(Rocket, payload)
+
+
+def test_validate_data_records_quarantine():
+    raw = {
+        "launches": json.dumps([_raw("1"), {"id": "broken"}]).encode(),
+        "rockets": b'[{"id": "r1", "name": "Falcon"}]',
+        "launchpads": b"[]",
+    }
+
+    cache = validate_data(raw)
+
+    assert [t.id for t in cache["launches"]] == ["1"]
+    assert cache["rockets"][0].name == "Falcon"
+    assert [q["id"] for q in cache["quarantined"]["launches"]] == ["broken"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_streamed_records_match_bulk_validation(chunk_size):
+    items = [_raw("1"), {**_raw("2"), "name": "Łódź ✓"}, {"id": "3"}, 42, _raw("5")]
+    payload = json.dumps(items, indent=2, ensure_ascii=False).encode()
+
+    stream = RecordStream(Launch)
+    for start in range(0, len(payload), chunk_size):
+        stream.feed(payload[start : start + chunk_size])
+    streamed = stream.close()
+
+    valid, bad = validate_records(Launch, payload)
+    assert streamed.records == valid
+    assert [(q["pos"], q["id"]) for q in streamed.quarantined] == [
+        (q["pos"], q["id"]) for q in bad
+    ]
+    assert [q["pos"] for q in streamed.quarantined] == [2, 3]
+
+
+@pytest.mark.parametrize(
+    "payload, error",
+    [
+        (b'{"docs": []}', json.JSONDecodeError),
+        (b"[1, 2", json.JSONDecodeError),
+        (b"[] []", json.JSONDecodeError),
+        (b"", json.JSONDecodeError),
+        (b'[{"name": "no id"}]', ValidationError),
+    ],
+)
+def test_unusable_stream_raises(payload, error):
+    stream = RecordStream(Rocket)
+    with pytest.raises(error):
+        stream.feed(payload)
+        stream.close()
+
+
+@pytest.mark.asyncio
+async def test_get_data_validates_while_streaming():
+    with respx.mock:
+        respx.get("https://api.spacexdata.com/v4/launches").mock(
+            return_value=httpx.Response(200, json=[_raw("1"), {"id": "x"}])
+        )
+        respx.get("https://api.spacexdata.com/v4/rockets").mock(
+            return_value=httpx.Response(200, content=b"<html>maintenance</html>")
+        )
+        before = UPSTREAM_ERRORS.values.get(("rockets", "invalid"), 0)
+        launches = await get_data("launches")
+        rockets = await get_data("rockets")
+
+    assert [type(t) for t in launches.records] == [LaunchRecord]
+    assert (
+        launches.records[0].to_launch()
+        == compact(Launch.model_validate(_raw("1"))).to_launch()
+    )
+    assert [q["id"] for q in launches.quarantined] == ["x"]
+    assert rockets is None
+    assert UPSTREAM_ERRORS.values[("rockets", "invalid")] == before + 1